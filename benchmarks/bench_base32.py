@@ -0,0 +1,60 @@
+"""Compare the table driven base32 codec with the base64 module.
+
+Usage:
+    $ python benchmarks/bench_base32.py
+"""
+
+import base64
+import timeit
+
+from obscure.encoder import _b32_crockford, base32_decode, base32_encode
+
+_to_crockford = bytes.maketrans(base64._b32alphabet, _b32_crockford)  # type: ignore
+_from_crockford = bytes.maketrans(_b32_crockford, base64._b32alphabet)  # type: ignore
+
+
+def b32_module_encode(number: int) -> str:
+    """Base32 encode the way obscure did through the base64 module."""
+    size = max(1, (number.bit_length() + 7) // 8)
+    return (
+        base64.b32encode(number.to_bytes(size, "big"))
+        .translate(_to_crockford)
+        .decode("utf-8")
+        .rstrip("=")
+    )
+
+
+def b32_module_decode(text: str) -> int:
+    """Base32 decode the way obscure did through the base64 module."""
+    text += "=" * (-len(text) % 8)
+    return int.from_bytes(
+        base64.b32decode(text.encode("utf-8").translate(_from_crockford)), "big"
+    )
+
+
+def bench(func, arg, number: int = 200_000) -> float:
+    """Return the best nanoseconds per call of func(arg)."""
+    best = min(timeit.repeat(lambda: func(arg), number=number, repeat=5))
+    return best / number * 1e9
+
+
+def main():
+    """Print ns/call for each codec and value size."""
+    print(f"{'bits':>4} {'op':>6} {'base64':>10} {'table':>10} {'speedup':>8}")
+    for bits in (32, 64, 128):
+        value = (1 << bits) // 3
+        text = base32_encode(value)
+        assert text == b32_module_encode(value)
+        assert value == base32_decode(text) == b32_module_decode(text)
+        for op, old, new, arg in (
+            ("encode", b32_module_encode, base32_encode, value),
+            ("decode", b32_module_decode, base32_decode, text),
+        ):
+            slow, fast = bench(old, arg), bench(new, arg)
+            print(
+                f"{bits:>4} {op:>6} {slow:>8.0f}ns {fast:>8.0f}ns {slow / fast:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Compare the general, specialized and C Feistel cipher per call.
+
+Also compare `KeyedCipher`, with a subkey per round, to the single salt
+`FeistelCipher`; the key schedule should add no cost per call.
+
+Usage:
+    $ python benchmarks/bench_cipher.py
+"""
+
+import timeit
+
+from obscure.feistel import (
+    FeistelCipher,
+    FeistelFx,
+    KeyedCipher,
+    _compile_feistel_cipher,
+    _feistel_closure,
+    _speedups,
+)
+
+SALT = 0xC101
+PRIME = 4049
+ROUNDS = 4
+
+
+def bench(func, value: int, number: int = 200_000) -> float:
+    """Return the best nanoseconds per call of func(value)."""
+    best = min(timeit.repeat(lambda: func(value), number=number, repeat=5))
+    return best / number * 1e9
+
+
+def main():
+    """Print ns/call for each cipher and domain size."""
+    print(f"{'bits':>4} {'closure':>10} {'compiled':>10} {'speedup':>8} {'C':>10}")
+    for bits in (32, 64):
+        value = (1 << bits) // 3
+        general = _feistel_closure(FeistelFx(SALT, PRIME), bits, ROUNDS)
+        compiled = _compile_feistel_cipher(SALT, PRIME, bits, ROUNDS)
+        assert general(value) == compiled(value)
+        slow, fast = bench(general, value), bench(compiled, value)
+        line = f"{bits:>4} {slow:>8.0f}ns {fast:>8.0f}ns {slow / fast:>7.2f}x"
+        if _speedups is not None:
+            c = _speedups.Cipher(SALT, PRIME, bits, ROUNDS).transform
+            assert c(value) == compiled(value)
+            line += f" {bench(c, value):>8.0f}ns"
+        print(line)
+
+    print(f"\n{'bits':>4} {'salt':>10} {'keyed':>10} {'inverse':>10} {'python':>10}")
+    for bits in (32, 64):
+        value = (1 << bits) // 3
+        salted = FeistelCipher(SALT, PRIME, bits, ROUNDS).transform
+        keyed = KeyedCipher(b"master key", PRIME, bits, ROUNDS)
+        python = _compile_feistel_cipher(keyed.keys, PRIME, bits, ROUNDS)
+        print(
+            f"{bits:>4} {bench(salted, value):>8.0f}ns"
+            f" {bench(keyed.transform, value):>8.0f}ns"
+            f" {bench(keyed.inverse, value):>8.0f}ns"
+            f" {bench(python, value):>8.0f}ns"
+        )
+
+
+if __name__ == "__main__":
+    main()
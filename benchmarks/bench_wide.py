@@ -0,0 +1,54 @@
+"""Compare the 64-bit limb `WideCipher` to the big-int `FeistelCipher`.
+
+Both permute 128 and 256-bit domains; the limb cipher should cost about
+the same per call as a 64-bit cipher.  Also time the `uuid.UUID` round
+trip through `WideCipher.transform_uuid`.
+
+Usage:
+    $ python benchmarks/bench_wide.py
+"""
+
+import timeit
+import uuid
+
+from obscure.feistel import FeistelCipher
+from obscure.wide import WideCipher, _wide_closure
+
+SALT = 0xC101
+PRIME = 4049
+ROUNDS = 4
+
+
+def bench(func, value, number: int = 100_000) -> float:
+    """Return the best nanoseconds per call of func(value)."""
+    best = min(timeit.repeat(lambda: func(value), number=number, repeat=5))
+    return best / number * 1e9
+
+
+def main():
+    """Print ns/call for the big-int, pure Python limb and C limb ciphers."""
+    print(f"{'bits':>4} {'big-int':>10} {'limbs':>10} {'limbs C':>10} {'speedup':>8}")
+    for bits in (128, 256):
+        value = (1 << bits) // 3
+        big = FeistelCipher(SALT, PRIME, bits, ROUNDS).transform
+        wide = WideCipher(b"master key", bits, ROUNDS)
+        python = _wide_closure(wide.keys, bits)
+        assert python(value) == wide.transform(value)
+        slow, fast = bench(big, value), bench(wide.transform, value)
+        print(
+            f"{bits:>4} {slow:>8.0f}ns {bench(python, value):>8.0f}ns"
+            f" {fast:>8.0f}ns {slow / fast:>7.2f}x"
+        )
+
+    cipher = WideCipher(b"master key")
+    big = FeistelCipher(SALT, PRIME, 128, ROUNDS).transform
+    u = uuid.uuid4()
+    print(
+        f"\nuuid UUID(int=big-int) {bench(lambda u: uuid.UUID(int=big(u.int)), u):>8.0f}ns"
+    )
+    print(f"uuid transform_uuid    {bench(cipher.transform_uuid, u):>8.0f}ns")
+    print(f"uuid inverse_uuid      {bench(cipher.inverse_uuid, u):>8.0f}ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Benchmark suite for the cipher, encodings, Encoder and CLI.
+
+Report ns/op and ops/sec for each case and save the results as JSON.
+Give a previous JSON file to compare against it as a baseline.
+
+Usage:
+    $ python benchmarks/suite.py --json benchmarks/results/latest.json
+    $ python benchmarks/suite.py --compare benchmarks/results/baseline.json
+    $ nox -s bench -- --compare benchmarks/results/baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import typing
+
+from obscure import Encoder, FeistelCipher, KeyedCipher, WideCipher, encodings
+from obscure.feistel import _speedups
+
+SALT = 0xC101
+PRIME = 4049
+CLI_LINES = 100_000
+
+
+def measure(func: typing.Callable[[], object], repeat: int = 5) -> float:
+    """Return the best nanoseconds per call of func()."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def cipher_cases() -> typing.Iterator[typing.Tuple[str, typing.Callable]]:
+    """Scalar transform at several domain sizes and rounds."""
+    for bits in (16, 32, 64, 128):
+        for rounds in (2, 4, 8):
+            cipher = FeistelCipher(SALT, PRIME, bits, rounds)
+            value = (1 << bits) // 3
+            yield f"cipher/{bits}bit/{rounds}rounds", lambda c=cipher, v=value: c(v)
+        keyed = KeyedCipher(b"master key", PRIME, bits)
+        yield f"keyed/{bits}bit/4rounds", lambda c=keyed, v=value: c(v)
+    for bits in (128, 256):
+        wide = WideCipher(b"master key", bits)
+        value = (1 << bits) // 3
+        yield f"wide/{bits}bit/4rounds", lambda c=wide, v=value: c(v)
+
+
+def encoding_cases() -> typing.Iterator[typing.Tuple[str, typing.Callable]]:
+    """Each entry in `encodings`, in both directions."""
+    for name, (encode, decode) in sorted(encodings.items()):
+        for bits in (32, 64, 128):
+            value = (1 << bits) // 3
+            text = encode(value)
+            yield f"encode/{name}/{bits}bit", lambda f=encode, v=value: f(v)
+            yield f"decode/{name}/{bits}bit", lambda f=decode, t=text: f(t)
+
+
+def encoder_cases() -> typing.Iterator[typing.Tuple[str, typing.Callable]]:
+    """Encoder.encode and Encoder.decode."""
+    for name in ("base32", "base64"):
+        encoder = Encoder(FeistelCipher(SALT, PRIME, 64), name)
+        text = encoder.encode(101038)
+        yield f"Encoder.encode/{name}", lambda e=encoder: e.encode(101038)
+        yield f"Encoder.decode/{name}", lambda e=encoder, t=text: e.decode(t)
+        data = encoder.encode_bytes(101038)
+        yield f"Encoder.encode_bytes/{name}", lambda e=encoder: e.encode_bytes(101038)
+        yield (
+            f"Encoder.decode_bytes/{name}",
+            lambda e=encoder, d=data: e.decode_bytes(d),
+        )
+        yield f"Encoder.try_decode/{name}", lambda e=encoder, t=text: e.try_decode(t)
+        yield f"Encoder.try_decode/{name}/junk", lambda e=encoder: e.try_decode("~~~")
+
+
+def cli_cases() -> typing.Iterator[typing.Tuple[str, float]]:
+    """Streaming CLI throughput, including interpreter start up."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "ids.txt")
+        with open(source, "w", encoding="utf-8") as out:
+            out.writelines(f"{_}\n" for _ in range(CLI_LINES))
+        for mode in ("num", "base32"):
+            command = [sys.executable, "-m", "obscure", "-p", str(PRIME)]
+            command += ["-s", str(SALT), "--mode", mode, "--encode"]
+            command += ["-i", source, "-o", os.devnull]
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                subprocess.run(command, check=True)
+                best = min(best, time.perf_counter() - start)
+            yield f"cli/stream/{mode}", best / CLI_LINES * 1e9
+
+
+def run() -> typing.List[typing.Dict[str, typing.Any]]:
+    """Run every case and return the results."""
+    results = []
+    for cases in (cipher_cases, encoding_cases, encoder_cases):
+        for name, func in cases():
+            results.append((name, measure(func)))
+    results.extend(cli_cases())
+    return [
+        {"name": name, "ns_per_op": round(ns, 1), "ops_per_sec": round(1e9 / ns)}
+        for name, ns in results
+    ]
+
+
+def compare(
+    results: typing.List[typing.Dict[str, typing.Any]],
+    baseline: typing.List[typing.Dict[str, typing.Any]],
+    tolerance: float,
+) -> int:
+    """Print the change from baseline, returning the number of regressions."""
+    before = {_["name"]: _["ns_per_op"] for _ in baseline}
+    regressions = 0
+    for result in results:
+        old = before.get(result["name"])
+        if old is None:
+            continue
+        change = result["ns_per_op"] / old - 1
+        flag = ""
+        if change > tolerance:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(
+            f"{result['name']:<32} {old:>10.0f} -> {result['ns_per_op']:>8.0f}ns"
+            f" {change:>+7.1%}{flag}"
+        )
+    return regressions
+
+
+def main(cmdline=None) -> int:
+    """Run the suite; return non-zero on regressions against a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--json", metavar="FILE", help="save the results to FILE")
+    parser.add_argument("--compare", metavar="FILE", help="baseline results JSON")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.10,
+        help="slowdown allowed against the baseline, default(0.10)",
+    )
+    args = parser.parse_args(cmdline)
+
+    results = run()
+    for result in results:
+        print(
+            f"{result['name']:<32} {result['ns_per_op']:>10.0f} ns/op"
+            f" {result['ops_per_sec']:>12,} ops/sec"
+        )
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as out:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "speedups": _speedups is not None,
+                    "results": results,
+                },
+                out,
+                indent=2,
+            )
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline:
+            regressions = compare(
+                results, json.load(baseline)["results"], args.tolerance
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
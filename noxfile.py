@@ -76,7 +76,8 @@ pyproject_versions = uv_versions_allowed_by_pyproject()
 @nox.session(venv_backend="uv|venv", python=pyproject_versions)
 def test(session: nox.Session):
     session.install("pytest", "pytest-cov")
-    session.install("-e", ".")
+    # The optional extras, or collecting their modules' doctests fails
+    session.install("-e", ".[numpy,pandas,arrow]")
 
     # remove existing coverage
     session.run(*cmd("coverage erase"))
@@ -86,3 +87,17 @@ def test(session: nox.Session):
     # session.run(*cmd("coverage run -m pytest"))
     session.run(*cmd("pytest --cov"))
     session.run(*cmd("coverage report --fail-under=100 --skip-covered --show-missing"))
+
+
+@nox.session(venv_backend="uv|venv")
+def bench(session: nox.Session):
+    """Run the benchmark suite, saving JSON for later comparison.
+
+    Compare with a baseline:
+        nox -s bench -- --compare benchmarks/results/baseline.json
+    """
+    session.install("-e", ".")
+    session.run(
+        *cmd("python benchmarks/suite.py --json benchmarks/results/latest.json"),
+        *session.posargs,
+    )
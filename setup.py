@@ -0,0 +1,13 @@
+"""Build the optional C speedups; obscure works without them."""
+
+from setuptools import Extension, setup
+
+setup(
+    ext_modules=[
+        Extension(
+            "obscure._speedups",
+            sources=["src/obscure/_speedups.c"],
+            optional=True,
+        )
+    ]
+)
@@ -114,15 +114,69 @@ whirlwind, fear not—our Feistel cipher knows the trick to bring them
 back, just as good as new!
 """
 
-from .encoder import (
-    encodings,
-    # base32_decode,
-    # base32_encode,
-    # base64_decode,
-    # base64_encode,
-    # hex_decode,
-    # hex_encode,
-)
-from .feistel import Encoder, FeistelCipher, FeistelFx
-
-__all__ = ["Encoder", "FeistelCipher", "FeistelFx", "encodings"]
+from __future__ import annotations  # Remove when supporting python3.10+
+
+# Not `typing.TYPE_CHECKING`; importing typing costs more than the rest of
+# `import obscure`.  Type checkers treat any TYPE_CHECKING as True.
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # pragma: no cover
+    from .domain import DomainCipher
+    from .encoder import (
+        encodings,
+        # base32_decode,
+        # base32_encode,
+        # base64_decode,
+        # base64_encode,
+        # hex_decode,
+        # hex_encode,
+    )
+    from .feistel import CachedEncoder, Encoder, FeistelCipher, FeistelFx, KeyedCipher
+    from .registry import EncoderRegistry
+    from .table import TableCipher
+    from .wide import WideCipher
+
+__all__ = [
+    "CachedEncoder",
+    "DomainCipher",
+    "Encoder",
+    "EncoderRegistry",
+    "FeistelCipher",
+    "FeistelFx",
+    "KeyedCipher",
+    "TableCipher",
+    "WideCipher",
+    "encodings",
+]
+
+# Submodule of each public name, imported on first access (PEP 562) so
+# `import obscure` costs next to nothing until something is used.
+_submodules = {
+    "CachedEncoder": "feistel",
+    "DomainCipher": "domain",
+    "Encoder": "feistel",
+    "EncoderRegistry": "registry",
+    "FeistelCipher": "feistel",
+    "FeistelFx": "feistel",
+    "KeyedCipher": "feistel",
+    "TableCipher": "table",
+    "WideCipher": "wide",
+    "encodings": "encoder",
+}
+
+
+def __getattr__(name: str) -> object:
+    """Import the submodule of a public name when first accessed."""
+    try:
+        submodule = _submodules[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    import importlib
+
+    value = getattr(importlib.import_module(f".{submodule}", __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    """Include the lazily imported names."""
+    return sorted(set(globals()) | set(__all__))
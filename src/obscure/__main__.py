@@ -1,8 +1,12 @@
 """Command-line execution."""
 
 import argparse
+import contextlib
+import functools
+import sys
+import typing
 
-from .encoder import Encode, encodings
+from .encoder import Encode, encodings, fixed_encodings
 from .feistel import Encoder, FeistelCipher
 
 _encodings = sorted(set(encodings.keys()))
@@ -24,6 +28,15 @@ _examples = """Example:
 
   $ python -m obscure {0} --mode=base64 p3MN4A
   100
+
+  Stream one value per line from a file, or stdin with '-'.
+  $ seq 0 1000000 | python -m obscure {0} --mode=base32 --encode --stdin
+
+  Spread a large file across four processes.
+  $ python -m obscure {0} --mode=base32 -i tokens.txt -o ids.txt -w 4
+
+  Transform a file of packed little-endian uint32 IDs, NumPy required.
+  $ python -m obscure {0} --binary uint32 -i ids.bin -o obscured.bin
       """.format("-p 4999 -s 1357 -b 32")
 # """.format("--prime=4999 --salt=1357 --bits=32")
 
@@ -34,7 +47,14 @@ def main(cmdline=None):
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     parser.add_argument("--demo", action="store_true", help="show all modes")
-    parser.add_argument("--decode", action="store_true")
+    parser.add_argument("--decode", action="store_const", const=True)
+    parser.add_argument(
+        "--encode",
+        dest="decode",
+        action="store_const",
+        const=False,
+        help="encode even when a --mode is given",
+    )
     parser.add_argument(
         "--mode",
         dest="encoding",
@@ -60,37 +80,155 @@ def main(cmdline=None):
         help="cipher bits in domain, default(64)",
         default=64,
     )
+    parser.add_argument(
+        "--fixed", action="store_true", help="encode every value with one length"
+    )
+    parser.add_argument(
+        "-i",
+        "--input",
+        metavar="FILE",
+        help="stream values, one per line, from FILE or '-' for stdin",
+    )
+    parser.add_argument(
+        "--stdin", dest="input", action="store_const", const="-", help="same as -i -"
+    )
+    parser.add_argument(
+        "-o", "--output", metavar="FILE", help="write results to FILE, default(stdout)"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        metavar="N",
+        type=int,
+        default=1,
+        help="processes used with --input, default(1)",
+    )
+    parser.add_argument(
+        "--binary",
+        metavar="DTYPE",
+        choices=("uint32", "uint64"),
+        help="--input is packed little-endian uint32 or uint64, memory mapped",
+    )
+    parser.add_argument(
+        "--in-place",
+        action="store_true",
+        help="with --binary, overwrite --input rather than write --output",
+    )
     parser.add_argument("values", nargs=argparse.REMAINDER)
     parser.epilog = _examples
 
     args = parser.parse_args(cmdline)
-    if not args.values:
+    if not args.values and args.input is None:
         parser.print_help()
         return
 
-    if "num" != args.encoding:
+    if args.decode is None:
         # Decode is implied. Needed as base32 and base64 could be all numbers
-        args.decode = True
-    else:
-        # Encoding "num" requires int parameter not string
-        args.values = [int(_) for _ in args.values]
+        args.decode = "num" != args.encoding
+    if not args.decode:
+        # Encoding requires int parameter not string
         args.values = tuple(map(int, args.values))
 
-    encoder = Encoder(FeistelCipher(args.salt, args.prime, args.bits), args.encoding)
+    if args.binary is not None:
+        if args.input in (None, "-") or args.values or args.demo:
+            print("--binary needs an --input file, without values or --demo.")
+        elif args.in_place == (args.output not in (None, "-")):
+            print("--binary needs either an --output file or --in-place.")
+        else:
+            binary(args)
+        return
+
+    fixed_bits = args.bits if args.fixed else 0
+    encoder = Encoder(
+        FeistelCipher(args.salt, args.prime, args.bits), args.encoding, fixed_bits
+    )
 
-    if not args.demo:
-        coder = getattr(encoder, ("decode" if args.decode else "encode"))
-        print(" ".join(str(coder(i)) for i in args.values))
+    coder = getattr(encoder, ("decode_many" if args.decode else "encode_many"))
+    if args.workers > 1:
+        # Only now pay for importing concurrent.futures
+        from .parallel import transform_parallel
+
+        coder = functools.partial(
+            transform_parallel,
+            salt=args.salt,
+            prime=args.prime,
+            bits=args.bits,
+            encoding=args.encoding,
+            decode=args.decode,
+            fixed_bits=fixed_bits,
+            workers=args.workers,
+        )
+    if args.input is not None:
+        if args.demo or args.values:
+            print("Give either values or --input, without --demo.")
+            return
+        with contextlib.ExitStack() as stack:
+            infile = sys.stdin
+            if "-" != args.input:
+                infile = stack.enter_context(open(args.input, encoding="utf-8"))
+            stream(coder, infile, _open_output(stack, args.output), not args.decode)
+    elif not args.demo:
+        with contextlib.ExitStack() as stack:
+            out = _open_output(stack, args.output)
+            print(" ".join(map(str, coder(args.values))), file=out)
     else:
         if args.decode or args.encoding != "num":
             print("Demo is only for encoding numbers.")
             return
 
+        table = fixed_encodings(args.bits) if args.fixed else encodings
         for encoding in _encodings:
-            meth: Encode = encodings[encoding][0]
+            meth: Encode = table[encoding][0]
             values = [meth(encoder.transform(int(i))) for i in args.values]
             print(f"{encoding}:  ", values)
 
 
+def binary(args: argparse.Namespace) -> None:
+    """Transform a binary file of packed IDs and report the throughput."""
+    # Only now pay for importing NumPy
+    from .bulk import transform_file
+
+    cipher = FeistelCipher(args.salt, args.prime, args.bits)
+    target = None if args.in_place else args.output
+    try:
+        stats = transform_file(cipher, args.input, target, args.binary)
+    except ValueError as exc:
+        print(exc)
+        return
+    print(stats, file=sys.stderr)
+
+
+def stream(
+    coder: typing.Callable[[typing.Iterable], typing.Iterable],
+    lines: typing.Iterable[str],
+    out: typing.TextIO,
+    numeric: bool,
+) -> None:
+    """Write a result line for every non-blank input line.
+
+    Lines are read, transformed and written one at a time, so memory use
+    is constant however long the input.
+
+    Args:
+        coder: `Encoder.encode_many` or `Encoder.decode_many`.
+        lines: Text lines of values, such as an open file.
+        out: Text file for the results.
+        numeric: The values are numbers rather than encoded strings.
+    """
+    values: typing.Iterable = filter(None, map(str.strip, lines))
+    if numeric:
+        values = map(int, values)
+    out.writelines(map("{}\n".format, coder(values)))
+
+
+def _open_output(
+    stack: contextlib.ExitStack, path: typing.Optional[str]
+) -> typing.TextIO:
+    """Return stdout or path opened for writing and closed with stack."""
+    if path in (None, "-"):
+        return sys.stdout
+    return stack.enter_context(open(path, "w", encoding="utf-8"))
+
+
 if __name__ == "__main__":  # pragma: no cover
     main()
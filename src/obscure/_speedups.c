@@ -0,0 +1,562 @@
+/* Optional C implementation of the default Feistel cipher.
+ *
+ * Implements the round loop of `create_feistel_cipher` with the default
+ * `feistel_fx` round function for domains of at most 64 bits.  Only the
+ * low `half + 15` bits of `(salt ^ value) * prime` survive the shift and
+ * mask, so wrapping 64-bit arithmetic gives results identical to the
+ * Python big-int version.
+ *
+ * The salt is either one number for every round or a key schedule of one
+ * subkey per round, as `KeyedCipher` uses.
+ *
+ * The package falls back to pure Python when this module is missing.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <structmember.h>
+#include <stdint.h>
+#include <string.h>
+
+typedef struct {
+    PyObject_HEAD
+    uint64_t *keys;
+    uint64_t prime;
+    uint64_t mask;
+    uint64_t full_mask;
+    int bits;
+    int half;
+    int rounds;
+} CipherObject;
+
+static inline uint64_t
+feistel(const CipherObject *c, uint64_t value)
+{
+    uint64_t lefty = (value >> c->half) & c->mask;
+    uint64_t righty = value & c->mask;
+    uint64_t fx, tmp;
+    int i;
+
+    for (i = 0; i < c->rounds; i++) {
+        fx = ((c->keys[i] ^ righty) * c->prime) >> (righty & 0xF);
+        tmp = righty;
+        righty = lefty ^ (fx & c->mask);
+        lefty = tmp;
+    }
+    return (righty << c->half) | lefty;
+}
+
+/* Convert an int to a domain value, raising ValueError when outside. */
+static int
+long_to_domain(const CipherObject *c, PyObject *obj, uint64_t *value)
+{
+    int overflow;
+    long long small;
+
+    small = PyLong_AsLongLongAndOverflow(obj, &overflow);
+    if (small == -1 && PyErr_Occurred()) {
+        return -1;
+    }
+    if (overflow < 0 || (overflow == 0 && small < 0)) {
+        goto not_in_domain;
+    }
+    if (overflow == 0) {
+        *value = (uint64_t)small;
+    }
+    else {
+        *value = PyLong_AsUnsignedLongLong(obj);
+        if (*value == (uint64_t)-1 && PyErr_Occurred()) {
+            PyErr_Clear();
+            goto not_in_domain;
+        }
+    }
+    if (*value > c->full_mask) {
+        goto not_in_domain;
+    }
+    return 0;
+
+not_in_domain:
+    PyErr_SetString(PyExc_ValueError, "value is not within domain");
+    return -1;
+}
+
+/* As `long_to_domain`, also taking integers such as NumPy's by __index__. */
+static int
+to_domain(const CipherObject *c, PyObject *obj, uint64_t *value)
+{
+    PyObject *index;
+    int result;
+
+    if (PyLong_Check(obj)) {
+        return long_to_domain(c, obj, value);
+    }
+    index = PyNumber_Index(obj);
+    if (index == NULL) {
+        return -1;
+    }
+    result = long_to_domain(c, index, value);
+    Py_DECREF(index);
+    return result;
+}
+
+static int
+Cipher_init(CipherObject *self, PyObject *args, PyObject *kwds)
+{
+    static char *kwlist[] = {"salt", "prime", "bits", "rounds", NULL};
+    PyObject *salt, *prime, *seq = NULL;
+    uint64_t *keys;
+    int bits, rounds, i;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "OO!ii", kwlist, &salt,
+                                     &PyLong_Type, &prime, &bits, &rounds)) {
+        return -1;
+    }
+    if (bits < 0 || bits > 64 || bits % 2) {
+        PyErr_SetString(PyExc_ValueError,
+                        "bits must be an even integer no greater than 64.");
+        return -1;
+    }
+    if (rounds < 0) {
+        PyErr_SetString(PyExc_ValueError, "rounds must not be negative.");
+        return -1;
+    }
+    if (!PyLong_Check(salt)) {
+        seq = PySequence_Fast(salt, "salt must be an integer or a sequence");
+        if (seq == NULL) {
+            return -1;
+        }
+        if (PySequence_Fast_GET_SIZE(seq) != rounds) {
+            Py_DECREF(seq);
+            PyErr_SetString(PyExc_ValueError,
+                            "salt sequence must have one key per round.");
+            return -1;
+        }
+    }
+    keys = PyMem_New(uint64_t, rounds > 0 ? rounds : 1);
+    if (keys == NULL) {
+        Py_XDECREF(seq);
+        PyErr_NoMemory();
+        return -1;
+    }
+    /* Two's complement masking keeps the low 64 bits, all F(x) needs. */
+    for (i = 0; i < rounds; i++) {
+        PyObject *key = seq ? PySequence_Fast_GET_ITEM(seq, i) : salt;
+        if (!PyLong_Check(key)) {
+            PyErr_SetString(PyExc_TypeError, "salt keys must be integers");
+            break;
+        }
+        keys[i] = PyLong_AsUnsignedLongLongMask(key);
+        if (PyErr_Occurred()) {
+            break;
+        }
+    }
+    Py_XDECREF(seq);
+    if (PyErr_Occurred()) {
+        PyMem_Free(keys);
+        return -1;
+    }
+    self->prime = PyLong_AsUnsignedLongLongMask(prime);
+    if (PyErr_Occurred()) {
+        PyMem_Free(keys);
+        return -1;
+    }
+    PyMem_Free(self->keys);
+    self->keys = keys;
+    self->bits = bits;
+    self->full_mask = bits == 64 ? UINT64_MAX : ((uint64_t)1 << bits) - 1;
+    self->half = bits / 2;
+    self->mask = self->full_mask >> self->half;
+    self->rounds = rounds;
+    return 0;
+}
+
+static void
+Cipher_dealloc(CipherObject *self)
+{
+    PyMem_Free(self->keys);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static PyObject *
+Cipher_transform(CipherObject *self, PyObject *obj)
+{
+    uint64_t value;
+
+    if (to_domain(self, obj, &value) < 0) {
+        return NULL;
+    }
+    return PyLong_FromUnsignedLongLong(feistel(self, value));
+}
+
+static PyObject *
+Cipher_batch(CipherObject *self, PyObject *iterable)
+{
+    PyObject *iter, *item, *result, *number;
+    uint64_t value;
+
+    iter = PyObject_GetIter(iterable);
+    if (iter == NULL) {
+        return NULL;
+    }
+    result = PyList_New(0);
+    if (result == NULL) {
+        Py_DECREF(iter);
+        return NULL;
+    }
+    while ((item = PyIter_Next(iter)) != NULL) {
+        if (to_domain(self, item, &value) < 0) {
+            Py_DECREF(item);
+            goto error;
+        }
+        Py_DECREF(item);
+        number = PyLong_FromUnsignedLongLong(feistel(self, value));
+        if (number == NULL || PyList_Append(result, number) < 0) {
+            Py_XDECREF(number);
+            goto error;
+        }
+        Py_DECREF(number);
+    }
+    if (PyErr_Occurred()) {
+        goto error;
+    }
+    Py_DECREF(iter);
+    return result;
+
+error:
+    Py_DECREF(iter);
+    Py_DECREF(result);
+    return NULL;
+}
+
+/* Wide domain cipher of `obscure.wide`, on 64-bit limbs.
+ *
+ * Each half of the value is `limbs` 64-bit limbs, least significant
+ * first.  The round function folds the right half's limbs into the
+ * round key with the splitmix64 finalizer, then derives one output limb
+ * per input limb from the result.
+ */
+#define WIDE_MAX_LIMBS 4 /* per half, up to 512-bit domains */
+#define WIDE_GOLDEN 0x9E3779B97F4A7C15ULL
+
+typedef struct {
+    PyObject_HEAD
+    uint64_t *keys;
+    int rounds;
+    int limbs;
+    int bits;
+} WideObject;
+
+static inline uint64_t
+mix64(uint64_t x)
+{
+    x ^= x >> 30;
+    x *= 0xBF58476D1CE4E5B9ULL;
+    x ^= x >> 27;
+    x *= 0x94D049BB133111EBULL;
+    return x ^ (x >> 31);
+}
+
+/* Transform the limbs, right half first, in place. */
+static void
+wide_feistel(const WideObject *c, uint64_t *value)
+{
+    uint64_t left[WIDE_MAX_LIMBS], right[WIDE_MAX_LIMBS], h, tmp;
+    int i, j, n = c->limbs;
+
+    memcpy(right, value, n * sizeof(uint64_t));
+    memcpy(left, value + n, n * sizeof(uint64_t));
+    for (i = 0; i < c->rounds; i++) {
+        h = c->keys[i];
+        for (j = 0; j < n; j++) {
+            h = mix64(h ^ right[j]);
+        }
+        for (j = 0; j < n; j++) {
+            tmp = right[j];
+            right[j] = left[j] ^ mix64(h + (uint64_t)(j + 1) * WIDE_GOLDEN);
+            left[j] = tmp;
+        }
+    }
+    /* The halves are swapped on output, as in the default cipher. */
+    memcpy(value, left, n * sizeof(uint64_t));
+    memcpy(value + n, right, n * sizeof(uint64_t));
+}
+
+/* Convert an int to little-endian limbs, ValueError when outside. */
+static int
+long_to_limbs(const WideObject *c, PyObject *obj, uint64_t *value)
+{
+    unsigned char bytes[2 * WIDE_MAX_LIMBS * 8];
+    size_t size = 2 * c->limbs * 8;
+    int i, b;
+
+    if (_PyLong_Sign(obj) < 0) {
+        goto not_in_domain;
+    }
+#if PY_VERSION_HEX >= 0x030D0000
+    {
+        Py_ssize_t needed = PyLong_AsNativeBytes(
+            obj, bytes, (Py_ssize_t)size,
+            Py_ASNATIVEBYTES_LITTLE_ENDIAN | Py_ASNATIVEBYTES_UNSIGNED_BUFFER);
+        if (needed < 0) {
+            return -1;
+        }
+        if ((size_t)needed > size) {
+            goto not_in_domain;
+        }
+    }
+#else
+    if (_PyLong_AsByteArray((PyLongObject *)obj, bytes, size, 1, 0) < 0) {
+        if (!PyErr_ExceptionMatches(PyExc_OverflowError)) {
+            return -1;
+        }
+        PyErr_Clear();
+        goto not_in_domain;
+    }
+#endif
+    for (i = 0; i < 2 * c->limbs; i++) {
+        value[i] = 0;
+        for (b = 7; b >= 0; b--) {
+            value[i] = (value[i] << 8) | bytes[8 * i + b];
+        }
+    }
+    return 0;
+
+not_in_domain:
+    PyErr_SetString(PyExc_ValueError, "value is not within domain");
+    return -1;
+}
+
+/* As `long_to_limbs`, also taking integers such as NumPy's by __index__. */
+static int
+wide_to_limbs(const WideObject *c, PyObject *obj, uint64_t *value)
+{
+    PyObject *index;
+    int result;
+
+    if (PyLong_Check(obj)) {
+        return long_to_limbs(c, obj, value);
+    }
+    index = PyNumber_Index(obj);
+    if (index == NULL) {
+        return -1;
+    }
+    result = long_to_limbs(c, index, value);
+    Py_DECREF(index);
+    return result;
+}
+
+static PyObject *
+wide_from_limbs(const WideObject *c, const uint64_t *value)
+{
+    unsigned char bytes[2 * WIDE_MAX_LIMBS * 8];
+    size_t size = 2 * c->limbs * 8;
+    int i, b;
+
+    for (i = 0; i < 2 * c->limbs; i++) {
+        for (b = 0; b < 8; b++) {
+            bytes[8 * i + b] = (unsigned char)(value[i] >> (8 * b));
+        }
+    }
+#if PY_VERSION_HEX >= 0x030D0000
+    return PyLong_FromUnsignedNativeBytes(bytes, size,
+                                          Py_ASNATIVEBYTES_LITTLE_ENDIAN);
+#else
+    return _PyLong_FromByteArray(bytes, size, 1, 0);
+#endif
+}
+
+static int
+Wide_init(WideObject *self, PyObject *args, PyObject *kwds)
+{
+    static char *kwlist[] = {"keys", "bits", NULL};
+    PyObject *keys, *seq;
+    uint64_t *schedule;
+    Py_ssize_t rounds, i;
+    int bits;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "Oi", kwlist, &keys, &bits)) {
+        return -1;
+    }
+    if (bits <= 0 || bits % 128 || bits > 128 * WIDE_MAX_LIMBS) {
+        PyErr_SetString(PyExc_ValueError,
+                        "bits must be a multiple of 128 no greater than 512.");
+        return -1;
+    }
+    seq = PySequence_Fast(keys, "keys must be a sequence of integers");
+    if (seq == NULL) {
+        return -1;
+    }
+    rounds = PySequence_Fast_GET_SIZE(seq);
+    schedule = PyMem_New(uint64_t, rounds > 0 ? rounds : 1);
+    if (schedule == NULL) {
+        Py_DECREF(seq);
+        PyErr_NoMemory();
+        return -1;
+    }
+    for (i = 0; i < rounds; i++) {
+        PyObject *key = PySequence_Fast_GET_ITEM(seq, i);
+        if (!PyLong_Check(key)) {
+            PyErr_SetString(PyExc_TypeError, "keys must be integers");
+            break;
+        }
+        schedule[i] = PyLong_AsUnsignedLongLongMask(key);
+        if (PyErr_Occurred()) {
+            break;
+        }
+    }
+    Py_DECREF(seq);
+    if (PyErr_Occurred()) {
+        PyMem_Free(schedule);
+        return -1;
+    }
+    PyMem_Free(self->keys);
+    self->keys = schedule;
+    self->rounds = (int)rounds;
+    self->limbs = bits / 128;
+    self->bits = bits;
+    return 0;
+}
+
+static void
+Wide_dealloc(WideObject *self)
+{
+    PyMem_Free(self->keys);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static PyObject *
+Wide_transform(WideObject *self, PyObject *obj)
+{
+    uint64_t value[2 * WIDE_MAX_LIMBS];
+
+    if (self->limbs == 0) {
+        PyErr_SetString(PyExc_ValueError, "WideCipher is not initialized");
+        return NULL;
+    }
+    if (wide_to_limbs(self, obj, value) < 0) {
+        return NULL;
+    }
+    wide_feistel(self, value);
+    return wide_from_limbs(self, value);
+}
+
+static PyObject *
+Wide_batch(WideObject *self, PyObject *iterable)
+{
+    PyObject *iter, *item, *result, *number;
+
+    iter = PyObject_GetIter(iterable);
+    if (iter == NULL) {
+        return NULL;
+    }
+    result = PyList_New(0);
+    if (result == NULL) {
+        Py_DECREF(iter);
+        return NULL;
+    }
+    while ((item = PyIter_Next(iter)) != NULL) {
+        number = Wide_transform(self, item);
+        Py_DECREF(item);
+        if (number == NULL || PyList_Append(result, number) < 0) {
+            Py_XDECREF(number);
+            goto error;
+        }
+        Py_DECREF(number);
+    }
+    if (PyErr_Occurred()) {
+        goto error;
+    }
+    Py_DECREF(iter);
+    return result;
+
+error:
+    Py_DECREF(iter);
+    Py_DECREF(result);
+    return NULL;
+}
+
+static PyMethodDef Wide_methods[] = {
+    {"transform", (PyCFunction)Wide_transform, METH_O,
+     "Return the transformed number."},
+    {"batch", (PyCFunction)Wide_batch, METH_O,
+     "Return a list of the transformed numbers from an iterable."},
+    {NULL, NULL, 0, NULL}};
+
+static PyMemberDef Wide_members[] = {
+    {"bits", T_INT, offsetof(WideObject, bits), READONLY,
+     "Bits in the number domain."},
+    {NULL, 0, 0, 0, NULL}};
+
+static PyTypeObject WideType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "obscure._speedups.WideCipher",
+    .tp_doc = "WideCipher(keys, bits) on 64-bit limbs, one key per round.",
+    .tp_basicsize = sizeof(WideObject),
+    .tp_itemsize = 0,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_new = PyType_GenericNew,
+    .tp_init = (initproc)Wide_init,
+    .tp_dealloc = (destructor)Wide_dealloc,
+    .tp_methods = Wide_methods,
+    .tp_members = Wide_members,
+};
+
+static PyMethodDef Cipher_methods[] = {
+    {"transform", (PyCFunction)Cipher_transform, METH_O,
+     "Return the transformed number."},
+    {"batch", (PyCFunction)Cipher_batch, METH_O,
+     "Return a list of the transformed numbers from an iterable."},
+    {NULL, NULL, 0, NULL}};
+
+static PyMemberDef Cipher_members[] = {
+    {"bits", T_INT, offsetof(CipherObject, bits), READONLY,
+     "Bits in the number domain."},
+    {NULL, 0, 0, 0, NULL}};
+
+static PyTypeObject CipherType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "obscure._speedups.Cipher",
+    .tp_doc = "Cipher(salt, prime, bits, rounds) using the default F(x).\n\n"
+              "salt is a number, or a sequence of one key per round.",
+    .tp_basicsize = sizeof(CipherObject),
+    .tp_itemsize = 0,
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_new = PyType_GenericNew,
+    .tp_init = (initproc)Cipher_init,
+    .tp_dealloc = (destructor)Cipher_dealloc,
+    .tp_methods = Cipher_methods,
+    .tp_members = Cipher_members,
+};
+
+static struct PyModuleDef speedups_module = {
+    PyModuleDef_HEAD_INIT,
+    .m_name = "obscure._speedups",
+    .m_doc = "Optional C implementation of the Feistel ciphers.",
+    .m_size = -1,
+};
+
+PyMODINIT_FUNC
+PyInit__speedups(void)
+{
+    PyObject *module;
+
+    if (PyType_Ready(&CipherType) < 0 || PyType_Ready(&WideType) < 0) {
+        return NULL;
+    }
+    module = PyModule_Create(&speedups_module);
+    if (module == NULL) {
+        return NULL;
+    }
+    Py_INCREF(&CipherType);
+    if (PyModule_AddObject(module, "Cipher", (PyObject *)&CipherType) < 0) {
+        Py_DECREF(&CipherType);
+        Py_DECREF(module);
+        return NULL;
+    }
+    Py_INCREF(&WideType);
+    if (PyModule_AddObject(module, "WideCipher", (PyObject *)&WideType) < 0) {
+        Py_DECREF(&WideType);
+        Py_DECREF(module);
+        return NULL;
+    }
+    return module;
+}
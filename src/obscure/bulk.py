@@ -0,0 +1,152 @@
+"""Transform binary files of packed integers through a memory map.
+
+Data warehouse exports of IDs are often packed little-endian uint32 or
+uint64 files of several GB.  `transform_file` memory maps the file and
+runs the cipher over it a chunk at a time with the array round loop of
+`obscure.arrays`, into preallocated buffers, so no Python int is made
+for any ID and memory stays bounded by the chunk size.
+
+Example:
+    >>> import os, tempfile
+    >>> import numpy as np
+    >>> from obscure import FeistelCipher
+    >>> path = os.path.join(tempfile.mkdtemp(), "ids.bin")
+    >>> np.arange(3, dtype="<u4").tofile(path)
+    >>> stats = transform_file(FeistelCipher(4049, 49409), path, path + ".out")
+    >>> stats.count
+    3
+    >>> np.fromfile(path + ".out", dtype="<u4").tolist()
+    [2161199488, 489678117, 1713035285]
+
+NumPy is an optional dependency; install with `pip install obscure[numpy]`.
+"""
+
+from __future__ import annotations  # Remove when supporting python3.10+
+
+import os
+import time
+import typing
+
+import numpy as np
+
+from .arrays import _feistel_rounds, _round_keys
+
+dtypes = {"uint32": np.dtype("<u4"), "uint64": np.dtype("<u8")}
+
+
+class BulkStats(typing.NamedTuple):
+    """How much `transform_file` did and how long it took."""
+
+    count: int
+    bytes: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        """Numbers transformed per second."""
+        return self.count / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        """Return a one line throughput report."""
+        megabytes = self.bytes / 1e6
+        return (
+            f"{self.count} ids, {megabytes:.1f} MB in {self.seconds:.3f}s: "
+            f"{self.rate / 1e6:.1f} M ids/s, "
+            f"{megabytes / self.seconds if self.seconds else 0.0:.1f} MB/s"
+        )
+
+
+def transform_file(
+    cipher: typing.Any,
+    source: str | os.PathLike,
+    target: str | os.PathLike | None = None,
+    dtype: str | None = None,
+    chunk: int = 1 << 20,
+    inverse: bool = False,
+) -> BulkStats:
+    """Transform a file of packed little-endian unsigned integers.
+
+    Args:
+        cipher: A `FeistelCipher` or `KeyedCipher` of at most 64 bits.
+        source: The file of packed integers.
+        target: The file to write, replaced if it exists.  None, or
+            the source itself, to transform the source in place.
+        dtype: "uint32" or "uint64"; default by the cipher's bits.
+        chunk: Numbers transformed at a time.
+        inverse: Undo a `KeyedCipher`; a `FeistelCipher` is its own
+            inverse.
+
+    Returns:
+        The count, bytes and seconds taken; `str()` of it is a report.
+
+    Raises:
+        ValueError: When the file size is not a whole number of
+            integers, the cipher's bits exceed the integer width, or a
+            number is outside the domain.  Nothing is written then.
+    """
+    start = time.perf_counter()
+    bits = cipher.bits
+    if dtype is None:
+        dtype = "uint32" if bits <= 32 else "uint64"
+    if dtype not in dtypes:
+        raise ValueError(f"{dtype!r} is not one of {list(dtypes)!r}")
+    file_dtype = dtypes[dtype]
+    if bits > 8 * file_dtype.itemsize:
+        raise ValueError(f"a {bits}-bit cipher does not fit {dtype}")
+    keys = getattr(cipher, "keys", None)
+    keys = _round_keys(cipher.salt if keys is None else keys, bits, cipher.rounds)
+    if inverse:
+        keys.reverse()
+    if chunk < 1:
+        raise ValueError("chunk must be positive")
+
+    if target is not None and os.path.exists(target):
+        if os.path.samefile(source, target):
+            target = None  # Opening it "w+" would truncate the source
+    size = os.path.getsize(source)
+    if size % file_dtype.itemsize:
+        raise ValueError(f"{source} is not a whole number of {dtype}")
+    count = size // file_dtype.itemsize
+    if not count:
+        if target is not None:
+            open(target, "wb").close()
+        return BulkStats(0, 0, time.perf_counter() - start)
+
+    values = np.memmap(
+        source, file_dtype, "r+" if target is None else "r", shape=(count,)
+    )
+    if bits < 8 * file_dtype.itemsize:
+        # Check everything first rather than leave a file half written
+        for low in range(0, count, chunk):
+            if int(values[low : low + chunk].max()) >> bits:
+                raise ValueError("value is not within domain")
+    out = values
+    if target is not None:
+        out = np.memmap(target, file_dtype, "w+", shape=(count,))
+    _transform_chunks(values, out, keys, cipher.prime, bits, chunk)
+    out.flush()
+    del values, out  # Unmap before reporting the time
+    return BulkStats(count, size, time.perf_counter() - start)
+
+
+def _transform_chunks(
+    values: np.ndarray,
+    out: np.ndarray,
+    keys: typing.List[int],
+    prime: int,
+    bits: int,
+    chunk: int,
+) -> None:
+    """Run the rounds over values into out, a chunk at a time."""
+    # The round loop works in the file's width, so out needs no scratch.
+    work = values.dtype.newbyteorder("=")
+    size = min(chunk, len(values))
+    lefty, righty, fx = (np.empty(size, dtype=work) for _ in range(3))
+    half = work.type(bits // 2)
+    for low in range(0, len(values), chunk):
+        high = min(low + chunk, len(values))
+        count = high - low
+        r, left, f = righty[:count], lefty[:count], fx[:count]
+        np.copyto(r, values[low:high], casting="unsafe")
+        np.right_shift(r, half, out=left)
+        _feistel_rounds(left, r, f, keys, prime, bits, out[low:high])
@@ -0,0 +1,324 @@
+"""Obscure pandas and pyarrow columns of IDs.
+
+`df["id"].map(encoder.encode)` makes a Python call per row through the
+cipher and builds an object column.  These helpers run the cipher over
+the whole column with `transform_array`, then build the result column
+at once.  For "hex", "base32" and "base64" the digits of every token
+are computed with array operations and the Arrow string column is built
+straight from the buffers; other encodings build it from one list of
+tokens.  Nulls stay null.
+
+Example:
+    >>> import pandas as pd
+    >>> from obscure import Encoder, FeistelCipher
+    >>> encoder = Encoder(FeistelCipher(4049, 49409), "hex")
+    >>> ids = pd.Series([0, 1, None], dtype="Int64", name="id")
+    >>> tokens = encode_column(ids, encoder)
+    >>> tokens.tolist()
+    ['80d14980', '1d2fe525', <NA>]
+    >>> decode_column(tokens, encoder).tolist()
+    [0, 1, <NA>]
+
+pandas and pyarrow are optional dependencies, imported only for their
+own columns; install with `pip install obscure[pandas]` or
+`pip install obscure[arrow]`.  NumPy is needed by both.
+"""
+
+from __future__ import annotations  # Remove when supporting python3.10+
+
+import functools
+import math
+import typing
+
+from .encoder import (
+    _b32_crockford,
+    _b64_chars,
+    base32_encode,
+    base64_encode,
+    hex_encode,
+)
+from .feistel import Encoder
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    import numpy as np
+
+Column = typing.Any  # pandas.Series, pyarrow.Array or pyarrow.ChunkedArray
+# Returns the digits of each value, right aligned, and how many to keep
+CharsFunc = typing.Callable[["np.ndarray"], typing.Tuple["np.ndarray", "np.ndarray"]]
+# Bytes of digits the int32 offsets of an Arrow string column can hold
+_STRING_LIMIT = 1 << 31
+
+
+def transform_column(column: Column, cipher: typing.Any, inverse: bool = False):
+    """Return the column of numbers transformed by the cipher.
+
+    Args:
+        column: A pandas Series or pyarrow Array of non-negative integers.
+        cipher: A cipher, vectorized when it has `transform_array`, as a
+            `FeistelCipher` or `KeyedCipher` up to 64 bits does.
+        inverse: Undo the transform; a cipher without `inverse` is its
+            own inverse.
+
+    Returns:
+        A column of the same kind, index and name; unsigned integers
+        when vectorized.
+
+    Raises:
+        TypeError: When column is not a pandas or pyarrow column.
+        ValueError: When a number is outside the cipher's domain.
+    """
+    kind = _column_kind(column)
+    if kind == "chunked":
+        return _chunked(transform_column, column, cipher, inverse)
+    values, mask = _to_numpy(kind, column)
+    return _from_numbers(kind, column, _transform(cipher, values, inverse), mask)
+
+
+def encode_column(column: Column, encoder: Encoder):
+    """Return the column of numbers transformed and encoded as strings.
+
+    Args:
+        column: A pandas Series or pyarrow Array of non-negative integers.
+        encoder: The `Encoder`; the "num" encoding gives numbers, as
+            `transform_column` does.
+
+    Returns:
+        A pandas "string" Series, or a pyarrow string Array.
+
+    Raises:
+        TypeError: When column is not a pandas or pyarrow column.
+        ValueError: When a number is outside the cipher's domain.
+    """
+    if encoder.encoder is int:
+        return transform_column(column, encoder.cipher)
+    kind = _column_kind(column)
+    if kind == "chunked":
+        return _chunked(encode_column, column, encoder)
+    values, mask = _to_numpy(kind, column)
+    values = _transform(encoder.cipher, values, False)
+    tokens = None
+    chars = _vector_encoder(encoder.encoder)
+    if chars is not None and values.dtype.kind == "u":
+        try:
+            tokens = _arrow_strings(chars, values, mask)
+        except ImportError:  # Without pyarrow, one str per number
+            pass
+    if tokens is None:
+        tokens = list(map(encoder.encoder, values.tolist()))
+        if mask is not None:
+            for i in mask.nonzero()[0].tolist():
+                tokens[i] = None
+    if kind == "pandas":
+        import pandas as pd
+
+        return pd.Series(
+            pd.array(tokens, dtype="string"), index=column.index, name=column.name
+        )
+    import pyarrow as pa
+
+    if isinstance(tokens, pa.Array):
+        return tokens
+    return pa.array(tokens, type=pa.string())
+
+
+def decode_column(column: Column, encoder: Encoder):
+    """Return the column of tokens decoded and transformed back to numbers.
+
+    Args:
+        column: A pandas Series or pyarrow Array of strings.
+        encoder: The `Encoder` the tokens were encoded with.
+
+    Returns:
+        A column of numbers like `transform_column` returns.
+
+    Raises:
+        TypeError: When column is not a pandas or pyarrow column.
+        ValueError: When a token is invalid or outside the cipher's domain.
+    """
+    import numpy as np
+
+    kind = _column_kind(column)
+    if kind == "chunked":
+        return _chunked(decode_column, column, encoder)
+    if kind == "pandas":
+        tokens = column.tolist()
+        nulls = column.isna().to_numpy()
+    else:
+        tokens = column.to_pylist()
+        nulls = column.is_null().to_numpy(zero_copy_only=False)
+    mask = nulls if nulls.any() else None
+    decoder = encoder.decoder
+    numbers = [0 if null else decoder(_) for _, null in zip(tokens, nulls.tolist())]
+    bits = getattr(encoder.cipher, "bits", math.inf)
+    wide = bits > 64
+    if not wide and max(numbers, default=0) >> bits:
+        # Name the token rather than let NumPy overflow
+        token = next(t for t, n in zip(tokens, numbers) if n >> bits)
+        raise ValueError(f"{token!r} is not within the cipher's domain")
+    values = np.array(numbers, dtype=object if wide else np.uint64)
+    return _from_numbers(kind, column, _transform(encoder.cipher, values, True), mask)
+
+
+def _vector_encoder(encode: typing.Callable) -> CharsFunc | None:
+    """Return the NumPy form of an `encodings` encoder, None if there isn't one."""
+    func = getattr(encode, "func", encode)
+    keywords = getattr(encode, "keywords", {})
+    if func is hex_encode:
+        return functools.partial(_hex_chars, width=keywords.get("width", 0))
+    num_bytes = keywords.get("num_bytes", 0)
+    if num_bytes > 8:
+        return None
+    if func is base32_encode:
+        return functools.partial(
+            _group_chars, alphabet=_b32_crockford, group=5, num_bytes=num_bytes
+        )
+    if func is base64_encode:
+        return functools.partial(
+            _group_chars, alphabet=_b64_chars.encode(), group=6, num_bytes=num_bytes
+        )
+    return None
+
+
+def _hex_chars(values: np.ndarray, width: int) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Return the 16 hex digits of each value and the lengths `hex_encode` keeps."""
+    import numpy as np
+
+    shifts = np.arange(60, -4, -4, dtype=np.uint64)
+    digits = values[:, None] >> shifts & np.uint64(0xF)
+    thresholds = np.array([1 << 4 * _ for _ in range(1, 16)], dtype=np.uint64)
+    lengths = np.maximum(np.searchsorted(thresholds, values, "right") + 1, width)
+    table = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+    return table[digits], lengths
+
+
+def _group_chars(
+    values: np.ndarray, alphabet: bytes, group: int, num_bytes: int
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Return the RFC 4648 digits of each value's bytes and their lengths.
+
+    As `base32_encode` and `base64_encode`, each value is its minimum
+    bytes, or num_bytes if more, zero filled to whole digits of `group`
+    bits.
+    """
+    import numpy as np
+
+    thresholds = np.array([1 << 8 * _ for _ in range(1, 8)], dtype=np.uint64)
+    nbytes = np.maximum(np.searchsorted(thresholds, values, "right") + 1, num_bytes)
+    lengths = (8 * nbytes + group - 1) // group
+    pad = group * lengths - 8 * nbytes
+    # Shift of each digit from the right; only the last can be negative.
+    shifts = group * np.arange((64 + group - 1) // group)[::-1] - pad[:, None]
+    column = values[:, None]
+    digits = np.where(
+        shifts < 0,
+        column << np.clip(-shifts, 0, 63).astype(np.uint64),
+        column >> np.clip(shifts, 0, 63).astype(np.uint64),
+    ) & np.uint64((1 << group) - 1)
+    table = np.frombuffer(alphabet, dtype=np.uint8)
+    return table[digits], lengths
+
+
+def _arrow_strings(
+    chars: CharsFunc, values: np.ndarray, mask: np.ndarray | None, chunk: int = 65536
+):
+    """Return a pyarrow string Array of the encoded values, built from buffers.
+
+    Raises:
+        ImportError: When pyarrow is not installed.
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    values = values.astype(np.uint64, copy=False)
+    pieces, lengths = [], []
+    for low in range(0, len(values), chunk):
+        digits, length = chars(values[low : low + chunk])
+        if mask is not None:
+            length[mask[low : low + chunk]] = 0
+        # Each row's digits are right aligned; keep the last `length`.
+        width = digits.shape[1]
+        pieces.append(digits[np.arange(width) >= width - length[:, None]])
+        lengths.append(length)
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    if lengths:
+        np.cumsum(np.concatenate(lengths), out=offsets[1:])
+    data = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.uint8)
+    string = pa.string()
+    if offsets[-1] < _STRING_LIMIT:
+        offsets = offsets.astype(np.int32)
+    else:
+        string = pa.large_string()
+    nulls = None
+    if mask is not None:
+        nulls = pa.py_buffer(np.packbits(~mask, bitorder="little"))
+    return pa.Array.from_buffers(
+        string, len(values), [nulls, pa.py_buffer(offsets), pa.py_buffer(data)]
+    )
+
+
+def _column_kind(column: Column) -> str:
+    """Return "pandas", "arrow" or "chunked" without importing either."""
+    module = type(column).__module__.partition(".")[0]
+    if module == "pandas" and hasattr(column, "index"):
+        return "pandas"
+    if module == "pyarrow" and hasattr(column, "null_count"):
+        return "chunked" if hasattr(column, "chunks") else "arrow"
+    raise TypeError("column must be a pandas Series or a pyarrow Array")
+
+
+def _chunked(func: typing.Callable, column: Column, *args: typing.Any):
+    """Apply func to each chunk of a pyarrow ChunkedArray."""
+    import pyarrow as pa
+
+    chunks = [func(chunk, *args) for chunk in column.chunks]
+    return pa.chunked_array(chunks) if chunks else column
+
+
+def _to_numpy(kind: str, column: Column) -> typing.Tuple[np.ndarray, np.ndarray | None]:
+    """Return the numbers, nulls as 0, and the null mask if any."""
+    import numpy as np
+
+    if kind == "pandas":
+        nulls = column.isna().to_numpy()
+        values = (column.fillna(0) if nulls.any() else column).to_numpy()
+    else:
+        nulls = column.is_null().to_numpy(zero_copy_only=False)
+        values = column.fill_null(0).to_numpy(zero_copy_only=False)
+    if values.dtype.kind == "O":  # Python ints in an object column
+        values = np.array(values.tolist())
+    return values, (nulls if nulls.any() else None)
+
+
+def _transform(cipher: typing.Any, values: np.ndarray, inverse: bool) -> np.ndarray:
+    """Transform an array, vectorized when the cipher allows."""
+    import numpy as np
+
+    if getattr(cipher, "bits", math.inf) <= 64:
+        method = "inverse_array" if inverse else "transform_array"
+        array_func = getattr(cipher, method, getattr(cipher, "transform_array", None))
+        if array_func is not None:
+            return array_func(values)
+    # Any other cipher, one Python call per number
+    func = getattr(cipher, "transform", cipher)
+    if inverse:
+        func = getattr(cipher, "inverse", func)
+    results = list(map(func, values.tolist()))
+    return np.array(results) if results else np.zeros(0, dtype=np.uint64)
+
+
+def _from_numbers(
+    kind: str, column: Column, values: np.ndarray, mask: np.ndarray | None
+):
+    """Return values as a column of the kind, with the nulls of mask."""
+    if kind == "pandas":
+        import pandas as pd
+
+        if mask is not None and values.dtype.kind in "iu":
+            values = pd.arrays.IntegerArray(values, mask)
+        elif mask is not None:  # Python ints of a wide cipher
+            values = values.astype(object)
+            values[mask] = pd.NA
+        return pd.Series(values, index=column.index, name=column.name)
+    import pyarrow as pa
+
+    return pa.array(values, mask=mask)
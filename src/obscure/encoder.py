@@ -1,20 +1,41 @@
 """Encoding/Decoding numbers."""
 
+from __future__ import annotations  # Remove when supporting python3.10+
+
 import base64
+import functools
 import typing
 
 Encode = typing.Callable[[int], str]
 Decode = typing.Callable[[str], int]
-_b32_alphabet_rfc4348: bytes = base64._b32alphabet  # type: ignore
+TryDecode = typing.Callable[[str], typing.Optional[int]]
+EncodeBytes = typing.Callable[[int], bytes]
+DecodeBytes = typing.Callable[[bytes], int]
 # Crockford eliminates some letter/number confusion
 _b32_crockford = b"0123456789ABCDEFGHJKMNPQRSTVWXYZ"  # Excludes 'ILOU'
-_b32_crockford_encode = bytes.maketrans(_b32_alphabet_rfc4348, _b32_crockford)
-_b32_crockford_decode = bytes.maketrans(_b32_crockford, _b32_alphabet_rfc4348)
+_b32_chars = _b32_crockford.decode("ascii")
+# Every 10-bit group as two characters
+_b32_pairs = tuple(a + b for a in _b32_chars for b in _b32_chars)
+# Crockford characters to the digits int(text, 32) expects.  Any other
+# character int() would accept becomes "!" and fails `isalnum()`.
+_b32_crockford_digits = str.maketrans(
+    _b32_chars + "ILOU" + "abcdefghijklmnopqrstuvwxyz",
+    "0123456789abcdefghijklmnopqrstuv" + "!" * 30,
+)
+_hex_chars = "0123456789abcdefABCDEF"
+# The same tables for bytes
+_b32_byte_pairs = tuple(_.encode("ascii") for _ in _b32_pairs)
+_b32_bytes = tuple(bytes((_,)) for _ in _b32_crockford)
+_b32_crockford_byte_digits = bytes.maketrans(
+    _b32_crockford + b"ILOU" + b"abcdefghijklmnopqrstuvwxyz",
+    b"0123456789abcdefghijklmnopqrstuv" + b"!" * 30,
+)
+_b64_chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
 
 
-def hex_encode(number: int) -> str:
-    """Return a string all hex no '0x' prefix."""
-    return "%x" % number
+def hex_encode(number: int, width: int = 0) -> str:
+    """Return a string all hex no '0x' prefix, zero filled to width."""
+    return "%0*x" % (width, number)
 
 
 def hex_decode(text: str) -> int:
@@ -22,6 +43,21 @@ def hex_decode(text: str) -> int:
     return int(text, 16)
 
 
+def try_hex_decode(text: str) -> int | None:
+    """Return int from hex digits, or None without raising."""
+    # Stripping every hex digit leaves any other character behind
+    if not text or text.strip(_hex_chars):
+        return None
+    return int(text, 16)
+
+
+def try_decimal_decode(text: str) -> int | None:
+    """Return int from decimal digits, or None without raising."""
+    if not (text.isascii() and text.isdigit()):
+        return None
+    return int(text)
+
+
 def _get_minimum_num_bytes(number: int) -> int:
     """Return minimum number of bytes needed to represent the given number.
 
@@ -51,21 +87,34 @@ def _add_padding(text: str, base: int) -> str:
     return text
 
 
-def base32_encode(number: int) -> str:
+def base32_encode(number: int, num_bytes: int = 0) -> str:
     """Encode number to base32 using the Crockford alphabet.
 
+    The output matches RFC 4648 base32 of the number's minimum bytes,
+    or num_bytes if more, without padding, drawn ten bits at a time
+    from a lookup table.
+
     Example:
         >>> base32_encode(0)
         '00'
+        >>> base32_encode(0, num_bytes=4)
+        '0000000'
     """
     if number < 0:
         raise ValueError("Non-negative number is required.")
-    return (
-        base64.b32encode(number.to_bytes(_get_minimum_num_bytes(number), "big"))
-        .translate(_b32_crockford_encode)
-        .decode("utf-8")
-        .rstrip("=")
-    )
+    num_bits = 8 * max(num_bytes, _get_minimum_num_bytes(number))
+    num_chars = (num_bits + 4) // 5
+    # Zero fill the last character like RFC 4648 does
+    number <<= 5 * num_chars - num_bits
+
+    parts = []
+    for _ in range(num_chars >> 1):
+        parts.append(_b32_pairs[number & 0x3FF])
+        number >>= 10
+    if num_chars & 1:
+        parts.append(_b32_chars[number])
+    parts.reverse()
+    return "".join(parts)
 
 
 def base32_decode(text: str) -> int:
@@ -75,27 +124,44 @@ def base32_decode(text: str) -> int:
         >>> base32_decode('00')
         0
     """
-    btext = _add_padding(text, 32).encode("utf-8")
-    btext = btext.translate(_b32_crockford_decode)
+    number = try_base32_decode(text)
+    if number is None:
+        raise ValueError("Invalid base32 string")
+    return number
 
-    try:
-        return int.from_bytes(base64.b32decode(btext), "big")
-    except ValueError as ex:
-        # Handle invalid base32 strings
-        raise ValueError("Invalid base32 string") from ex
 
+def try_base32_decode(text: str) -> int | None:
+    """Decode base32 string using the Crockford alphabet, None if invalid.
+
+    Example:
+        >>> try_base32_decode('00'), try_base32_decode('0O')
+        (0, None)
+    """
+    num_chars = len(text)
+    if not num_chars:
+        return 0
+    digits = text.translate(_b32_crockford_digits)
+    if num_chars % 8 in (1, 3, 6) or not (digits.isascii() and digits.isalnum()):
+        return None
+    # Drop the fill bits of the last character
+    num_bits = 5 * num_chars
+    return int(digits, 32) >> (num_bits % 8)
 
-def base64_encode(number: int) -> str:
-    """Encode number to base64.
+
+def base64_encode(number: int, num_bytes: int = 0) -> str:
+    """Encode number to base64 from its minimum bytes, or num_bytes if more.
 
     Example:
         >>> base64_encode(101038)
         'AYqu'
+        >>> base64_encode(101038, num_bytes=4)
+        'AAGKrg'
     """
     if number < 0:
         raise ValueError("Non-negative number is required.")
+    num_bytes = max(num_bytes, _get_minimum_num_bytes(number))
     return (
-        base64.urlsafe_b64encode(number.to_bytes(_get_minimum_num_bytes(number), "big"))
+        base64.urlsafe_b64encode(number.to_bytes(num_bytes, "big"))
         .decode("utf-8")
         .rstrip("=")
     )
@@ -116,9 +182,181 @@ def base64_decode(text: str) -> int:
         raise ValueError("Invalid base64 string") from ex
 
 
+def try_base64_decode(text: str) -> int | None:
+    """Decode unpadded URL safe base64 string, None if invalid.
+
+    Unlike `base64_decode`, any character outside the alphabet is
+    invalid rather than ignored.
+
+    Example:
+        >>> try_base64_decode('AYqu'), try_base64_decode('AY+u')
+        (101038, None)
+    """
+    if 1 == len(text) % 4 or text.strip(_b64_chars):
+        return None
+    btext = _add_padding(text, 64).encode("ascii")
+    return int.from_bytes(base64.urlsafe_b64decode(btext), "big")
+
+
+def hex_encode_bytes(number: int, width: int = 0) -> bytes:
+    """Return ASCII bytes all hex no '0x' prefix, zero filled to width."""
+    return b"%0*x" % (width, number)
+
+
+def _decimal_encode_bytes(number: int, width: int = 0) -> bytes:
+    """Return ASCII decimal bytes zero filled to width."""
+    return b"%0*d" % (width, number)
+
+
+def base32_encode_bytes(number: int, num_bytes: int = 0) -> bytes:
+    """Encode number to base32 ASCII bytes using the Crockford alphabet.
+
+    The same as `base32_encode`, without creating a str.
+
+    Example:
+        >>> base32_encode_bytes(101038)
+        b'065AW'
+    """
+    if number < 0:
+        raise ValueError("Non-negative number is required.")
+    num_bits = 8 * max(num_bytes, _get_minimum_num_bytes(number))
+    num_chars = (num_bits + 4) // 5
+    number <<= 5 * num_chars - num_bits
+
+    parts = []
+    for _ in range(num_chars >> 1):
+        parts.append(_b32_byte_pairs[number & 0x3FF])
+        number >>= 10
+    if num_chars & 1:
+        parts.append(_b32_bytes[number])
+    parts.reverse()
+    return b"".join(parts)
+
+
+def base32_decode_bytes(data: bytes) -> int:
+    """Decode base32 ASCII bytes using the Crockford alphabet.
+
+    Example:
+        >>> base32_decode_bytes(b'065AW')
+        101038
+    """
+    num_chars = len(data)
+    if not num_chars:
+        return 0
+    digits = data.translate(_b32_crockford_byte_digits)
+    if num_chars % 8 in (1, 3, 6) or not digits.isalnum():
+        raise ValueError("Invalid base32 string")
+    return int(digits, 32) >> (5 * num_chars % 8)
+
+
+def base64_encode_bytes(number: int, num_bytes: int = 0) -> bytes:
+    """Encode number to unpadded URL safe base64 ASCII bytes.
+
+    Example:
+        >>> base64_encode_bytes(101038)
+        b'AYqu'
+    """
+    if number < 0:
+        raise ValueError("Non-negative number is required.")
+    num_bytes = max(num_bytes, _get_minimum_num_bytes(number))
+    return base64.urlsafe_b64encode(number.to_bytes(num_bytes, "big")).rstrip(b"=")
+
+
+def base64_decode_bytes(data: bytes) -> int:
+    """Decode unpadded URL safe base64 ASCII bytes.
+
+    Example:
+        >>> base64_decode_bytes(b'AYqu')
+        101038
+    """
+    try:
+        return int.from_bytes(
+            base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4)), "big"
+        )
+    except ValueError as ex:
+        raise ValueError("Invalid base64 string") from ex
+
+
 encodings: typing.Dict[str, typing.Tuple[Encode, Decode]] = {
     "num": (typing.cast(Encode, int), typing.cast(Decode, int)),
     "hex": (hex_encode, hex_decode),
     "base32": (base32_encode, base32_decode),
     "base64": (base64_encode, base64_decode),
 }
+
+# The same encodings to and from ASCII bytes, skipping the str
+bytes_encodings: typing.Dict[str, typing.Tuple[EncodeBytes, DecodeBytes]] = {
+    "num": (_decimal_encode_bytes, typing.cast(DecodeBytes, int)),
+    "hex": (hex_encode_bytes, functools.partial(int, base=16)),
+    "base32": (base32_encode_bytes, base32_decode_bytes),
+    "base64": (base64_encode_bytes, base64_decode_bytes),
+}
+
+# Strict decoders, returning None rather than raising, keyed like `encodings`
+try_decoders: typing.Dict[str, TryDecode] = {
+    "num": try_decimal_decode,
+    "hex": try_hex_decode,
+    "base32": try_base32_decode,
+    "base64": try_base64_decode,
+}
+
+
+def _decimal_encode(number: int, width: int = 0) -> str:
+    """Return a decimal string zero filled to width."""
+    return "%0*d" % (width, number)
+
+
+def fixed_encodings(
+    bits: int, as_bytes: bool = False
+) -> typing.Dict[str, typing.Tuple[typing.Callable, typing.Callable]]:
+    """Return `encodings` that emit one length for every number in a domain.
+
+    Fixed width tokens fit fixed size columns and buffers.  For "num",
+    "hex" and "base32" they also sort in numeric order, as the alphabets
+    are in ASCII order.  The decoders are the usual ones.
+
+    Args:
+        bits: Bits in the number domain, usually the cipher's bits.
+        as_bytes: Fixed `bytes_encodings` rather than `encodings`.
+
+    Returns:
+        Encoders and decoders keyed like `encodings`.
+
+    Example:
+        >>> encode, decode = fixed_encodings(32)["base32"]
+        >>> encode(0), encode(0xFFFFFFFF)
+        ('0000000', 'ZZZZZZR')
+        >>> decode('0000000')
+        0
+    """
+    num_bytes = max(1, (bits + 7) // 8)
+    table = bytes_encodings if as_bytes else encodings
+    if as_bytes:
+        decimal, hexadecimal, b32, b64 = (
+            _decimal_encode_bytes,
+            hex_encode_bytes,
+            base32_encode_bytes,
+            base64_encode_bytes,
+        )
+    else:
+        decimal, hexadecimal, b32, b64 = (
+            _decimal_encode,
+            hex_encode,
+            base32_encode,
+            base64_encode,
+        )
+    return {
+        "num": (
+            functools.partial(decimal, width=len(str((1 << bits) - 1))),
+            table["num"][1],
+        ),
+        "hex": (functools.partial(hexadecimal, width=(bits + 3) // 4), table["hex"][1]),
+        "base32": (
+            functools.partial(b32, num_bytes=num_bytes),
+            table["base32"][1],
+        ),
+        "base64": (
+            functools.partial(b64, num_bytes=num_bytes),
+            table["base64"][1],
+        ),
+    }
@@ -35,6 +35,10 @@ Feistel algorithm:
         R[i] = L[i] xor F(R[i-1]), Optional[K[i]])
     Ciphertext is (R[N], L[N])
 
+    `FeistelCipher` uses the same salt every round, making the cipher
+    its own inverse.  `KeyedCipher` derives a subkey K[i] for each round
+    from a master key; undo it by applying the subkeys in reverse order.
+
 Reference:
     https://en.wikipedia.org/wiki/Feistel_cipher
 
@@ -42,14 +46,29 @@ Reference:
 
 from __future__ import annotations  # Remove when supporting python3.10+
 
+import collections
 import functools
-import random
+import math
+import sys
+import threading
 import typing
 
-from .encoder import encodings
+from .encoder import bytes_encodings, encodings, fixed_encodings, try_decoders
+
+# asyncio, concurrent.futures, hashlib and random are imported when first
+# needed, keeping them out of the start up time of short lived processes.
+if typing.TYPE_CHECKING:  # pragma: no cover
+    import concurrent.futures
+
+try:
+    from . import _speedups
+except ImportError:  # pragma: no cover - the C extension is optional
+    _speedups = None  # type: ignore
 
 IntInt = typing.Callable[[int], int]
-random.seed()
+Batch = typing.TypeVar("Batch")
+# Batches at least this size are encoded in an executor by the async methods
+OFFLOAD_THRESHOLD = 1000
 
 
 def feistel_fx(salt: int, prime: int, value: int) -> int:
@@ -68,26 +87,110 @@ def feistel_fx(salt: int, prime: int, value: int) -> int:
     return x >> (value & 0xF)
 
 
-def FeistelFx(salt: int | None = None, prime: int | None = None) -> IntInt:
-    """Create a Feistel round function `F(x)`.
+def feistel_fx_batch(salt: int, prime: int, values: Batch) -> Batch:
+    """Round function `F(x)` of many values at once.
 
     Args:
-        prime: A small prime number.
-            If None, select one from a list of over a 100.
         salt: A number making your transformations unique.
-            If None, use a random integer.
+        prime: A small prime number.
+        values: A sequence of ints, or a NumPy unsigned integer array.
 
     Returns:
-        A Feistel round function Callable[[int], int]
+        A list of `feistel_fx` of each value, or for an array, an array
+        of the same shape and dtype.  The product is worked in the
+        array's dtype, or uint32 if narrower, and wraps around there, so
+        only its low `w - 15` bits of a `w`-bit dtype match `feistel_fx`.
+        That is at least the half of any cipher the dtype holds.
+
+    Example:
+        >>> feistel_fx_batch(4049, 49409, [0, 1]) == [
+        ...     feistel_fx(4049, 49409, 0),
+        ...     feistel_fx(4049, 49409, 1),
+        ... ]
+        True
+    """
+    dtype = getattr(values, "dtype", None)
+    if dtype is None:
+        return typing.cast(
+            Batch,
+            [((salt ^ _) * prime) >> (_ & 0xF) for _ in typing.cast(list, values)],
+        )
+    if dtype.kind != "u":
+        raise TypeError("values must be an unsigned integer array")
+    if dtype.itemsize < 4:  # Too narrow to keep any bits of the shift
+        return feistel_fx_batch(salt, prime, values.astype("u4")).astype(dtype)
+    wrap = (1 << (8 * dtype.itemsize)) - 1
+    product = (values ^ dtype.type(salt & wrap)) * dtype.type(prime & wrap)
+    return product >> (values & dtype.type(0xF))
+
+
+class RoundFunction(typing.Protocol):
+    """A Feistel round function `F(x)`, optionally with a batch form.
+
+    Any `Callable[[int], int]` is a round function.  One may also have
+    `batch(values)`, taking a list of ints, or a NumPy unsigned array,
+    and returning `F(x)` of each in the same kind and shape.  Bulk
+    transforms such as `transform_range` call `batch` once per round
+    for the whole chunk rather than `F(x)` once per value.
+    """
+
+    def __call__(self, value: int) -> int:
+        """Return `F(x)` of one value."""
+
+
+class FeistelFx(functools.partial):
+    """The default Feistel round function `F(x)`, `feistel_fx` salted.
+
+    A `functools.partial` of `feistel_fx`, with a `batch` form.
     """
-    p = prime or random.choice(_primes)
-    s = salt or random.randint(1, 0xFFFFFF)
-    return functools.partial(feistel_fx, s, p)
+
+    def __new__(cls, salt: int | None = None, prime: int | None = None):
+        """Create a Feistel round function `F(x)`.
+
+        Args:
+            prime: A small prime number.
+                If None, select one from a list of over a 100.
+            salt: A number making your transformations unique.
+                If None, use a random integer.
+
+        Returns:
+            A Feistel round function Callable[[int], int]
+        """
+        if not (prime and salt):
+            # Seeded from os.urandom when first imported
+            import random
+
+            prime = prime or random.choice(_primes)
+            salt = salt or random.randint(1, 0xFFFFFF)
+        return super().__new__(cls, feistel_fx, salt, prime)
+
+    def __repr__(self) -> str:
+        """Return the expression to create this round function."""
+        salt, prime = self.args
+        return f"{type(self).__name__}(salt={salt!r}, prime={prime!r})"
+
+    def __reduce__(self):
+        """Pickle the salt and prime."""
+        return (type(self), self.args)
+
+    def batch(self, values: Batch) -> Batch:
+        """Return `F(x)` of many values, see `feistel_fx_batch`."""
+        salt, prime = self.args
+        return feistel_fx_batch(salt, prime, values)
 
 
 def create_feistel_cipher(fx: IntInt, bits: int, rounds: int):
     """Return default function for given parameters.
 
+    When `fx` is the default `F(x)` from `FeistelFx`, the returned
+    cipher is specialized.  The optional C extension handles domains up
+    to 64 bits, otherwise the salt, prime and masks become constants in
+    a cipher with the rounds unrolled.  Results are identical either way.
+
+    Any other `fx` is called each round.  The returned cipher then has
+    a `batch(values)` method, which uses the batch form of `fx` when it
+    has one; see `RoundFunction`.
+
     Args:
         fx: Transform function taking an int and returning another int.
         bits: Max size of function, usually 32 or 64.
@@ -98,74 +201,629 @@ def create_feistel_cipher(fx: IntInt, bits: int, rounds: int):
     """
     if not isinstance(bits, int) or 1 == bits % 2:
         raise ValueError("bits must be an even integer, usually 32 or 64.")
+    if (
+        isinstance(fx, functools.partial)
+        and fx.func is feistel_fx
+        and not fx.keywords
+        and 2 == len(fx.args)
+        and all(isinstance(_, int) for _ in fx.args)
+        and isinstance(rounds, int)
+    ):
+        salt, prime = fx.args
+        return _default_cipher(salt, prime, bits, rounds)
+    return _feistel_closure(fx, bits, rounds)
+
+
+def _default_cipher(
+    salt: int | typing.Sequence[int], prime: int, bits: int, rounds: int
+) -> IntInt:
+    """Return the fastest cipher using the default `F(x)`.
+
+    Args:
+        salt: The salt for `feistel_fx`, or a sequence of one per round.
+        prime: The prime for `feistel_fx`.
+        bits: Even number of bits in the domain.
+        rounds: Number of transformation rounds.
+
+    Returns:
+        Feistel cipher function
+    """
+    if _speedups is not None and 0 <= bits <= 64 and 0 <= rounds:
+        return _speedups.Cipher(salt, prime, bits, rounds).transform
+    return _compile_feistel_cipher(salt, prime, bits, rounds)
+
+
+def _feistel_closure(fx: IntInt, bits: int, rounds: int) -> IntInt:
+    """Return a Feistel cipher calling any `F(x)` each round.
+
+    The cipher's `batch(values)` transforms many values at once using
+    the batch form of `F(x)` when it has one; see `RoundFunction`.
+    """
     full_mask = (1 << bits) - 1
-    mask = full_mask >> (full_mask.bit_length() // 2)
+    half = full_mask.bit_length() // 2
+    mask = full_mask >> half
+    fx_batch = getattr(fx, "batch", None)
+
+    def round_batch(values: list) -> list:
+        if fx_batch is None:
+            return list(map(fx, values))
+        return fx_batch(values)
+
+    def batch(values: typing.Iterable[int]) -> typing.Any:
+        dtype = getattr(values, "dtype", None)
+        if dtype is not None:
+            if fx_batch is not None:
+                return _feistel_array(fx_batch, values, bits, rounds)
+            import numpy as np
+
+            result = batch(values.ravel().tolist())
+            return np.array(result, dtype=dtype).reshape(values.shape)
+        values = list(values)
+        if any(_ < 0 or _ > full_mask for _ in values):
+            raise ValueError("value is not within domain")
+        lefty = [mask & (_ >> half) for _ in values]
+        righty = [mask & _ for _ in values]
+        for _ in range(rounds):
+            lefty, righty = (
+                righty,
+                [x ^ (mask & y) for x, y in zip(lefty, round_batch(righty))],
+            )
+        return [r << half | x for x, r in zip(lefty, righty)]
 
     def feistel_cipher(value: int) -> int:
         if value < 0 or value > full_mask:
             raise ValueError("value is not within domain")
 
         # Split the input value into two halves
-        lefty = mask & (value >> mask.bit_length())
+        lefty = mask & (value >> half)
         righty = mask & value
 
         for _ in range(rounds):
             lefty, righty = (righty, (lefty ^ (mask & fx(righty))))
 
-        return righty << mask.bit_length() | lefty
+        return righty << half | lefty
 
+    feistel_cipher.batch = batch  # type: ignore[attr-defined]
+    feistel_cipher.bits = bits  # type: ignore[attr-defined]
     return feistel_cipher
 
 
-def FeistelCipher(
-    salt: int | None = None,
-    prime: int | None = None,
-    bits: int = 32,
-    rounds: int = 4,
+def _feistel_array(
+    fx_batch: typing.Callable, values: typing.Any, bits: int, rounds: int
+) -> typing.Any:
+    """Transform a NumPy unsigned array with a batch `F(x)`.
+
+    The halves are arrays of the values' dtype, or uint32 if narrower,
+    through every round, so `F(x)` has room for its product.
+    """
+    dtype = values.dtype
+    if dtype.kind != "u" or bits > 8 * dtype.itemsize:
+        raise TypeError("values must be an unsigned array wide enough for bits")
+    full_mask = (1 << bits) - 1
+    if values.size and values.max() > full_mask:
+        raise ValueError("value is not within domain")
+    work = values.astype("u4") if dtype.itemsize < 4 else values
+    half = work.dtype.type(bits // 2)
+    mask = work.dtype.type(full_mask >> (bits // 2))
+    lefty = (work >> half) & mask
+    righty = work & mask
+    for _ in range(rounds):
+        lefty, righty = righty, lefty ^ (mask & fx_batch(righty))
+    return ((righty << half) | lefty).astype(dtype, copy=False)
+
+
+def _compile_feistel_cipher(
+    salt: int | typing.Sequence[int], prime: int, bits: int, rounds: int
 ) -> IntInt:
-    """Return a Feistel cipher for int transformation.
+    """Return a Feistel cipher specialized for the default `F(x)`.
+
+    Generate the source of a cipher with `feistel_fx` inlined, the
+    constants as literals and one line per round.  Rather than swap
+    halves each round, the two variables take turns being updated.
+
+    Args:
+        salt: The salt for `feistel_fx`, or a sequence of one per round.
+        prime: The prime for `feistel_fx`.
+        bits: Even number of bits in the domain.
+        rounds: Number of transformation rounds.
+
+    Returns:
+        Feistel cipher function
+    """
+    keys = [salt] * rounds if isinstance(salt, int) else list(salt)
+    if len(keys) != rounds:
+        raise ValueError("salt sequence must have one key per round.")
+    full_mask = (1 << bits) - 1
+    half = full_mask.bit_length() // 2
+    mask = full_mask >> half
+
+    lines = [
+        "def feistel_cipher(value: int) -> int:",
+        f"    if value < 0 or value > {full_mask:d}:",
+        "        raise ValueError('value is not within domain')",
+        f"    a = {mask:d} & (value >> {half:d})",
+        f"    b = {mask:d} & value",
+    ]
+    lefty, righty = "a", "b"
+    for key in keys:
+        lines.append(
+            f"    {lefty} ^= {mask:d} & (({key:d} ^ {righty}) * {prime:d}"
+            f" >> ({righty} & 0xF))"
+        )
+        lefty, righty = righty, lefty
+    lines.append(f"    return {righty} << {half:d} | {lefty}")
+
+    namespace: typing.Dict[str, typing.Any] = {}
+    exec("\n".join(lines), namespace)  # Source holds only int literals
+    cipher = namespace["feistel_cipher"]
+    cipher.bits = bits  # The domain, for `Encoder.try_decode`
+    return cipher
+
+
+def _transform_range(
+    transform: IntInt, size: int | float, start: int, stop: int, chunk: int
+) -> typing.Iterator[typing.List[int]]:
+    """Check the range is within the domain and return its chunks.
 
     Args:
-        salt: Any number to salt the `F(x)`. Random if None.
-        prime: A small prime for `F(x)`. Random if None.
-        bits: Bits in the number domain, default(32).
-        rounds: The number of times `F(x)` is called, default(4).
+        transform: The cipher function.
+        size: Numbers in the domain.
+        start: The first number.
+        stop: One past the last number.
+        chunk: Numbers in each chunk.
+
+    Returns:
+        An iterator of lists of the transformed numbers.
+    """
+    if chunk < 1:
+        raise ValueError("chunk must be positive")
+    if start < stop and (start < 0 or stop > size):
+        raise ValueError("range is not within domain")
+    return _range_chunks(transform, start, stop, chunk)
+
+
+def _range_chunks(
+    transform: IntInt, start: int, stop: int, chunk: int
+) -> typing.Iterator[typing.List[int]]:
+    """Yield the chunks of `_transform_range` after its checks."""
+    # The C cipher's batch transforms a chunk without a Python call per
+    # number; a custom `F(x)` cipher's batch uses the batch `F(x)`.
+    batch = getattr(transform, "batch", None) or getattr(
+        getattr(transform, "__self__", None), "batch", None
+    )
+    for low in range(start, stop, chunk):
+        numbers = range(low, min(low + chunk, stop))
+        yield batch(numbers) if batch else list(map(transform, numbers))
+
+
+class FeistelCipher:
+    """A Feistel cipher for int transformation.
+
+    Call the cipher like a function to transform a number; calling it
+    on the result gives back the number.  The parameters are exposed
+    and the cipher can be pickled, or saved with `to_bytes` or
+    `to_dict`, to rebuild the same cipher elsewhere.
+
+    Example:
+        >>> cipher = FeistelCipher(4049, 49409)
+        >>> cipher(101038)
+        1674419098
+        >>> cipher
+        FeistelCipher(salt=4049, prime=49409, bits=32, rounds=4)
+        >>> FeistelCipher.from_bytes(cipher.to_bytes()) == cipher
+        True
+    """
+
+    __slots__ = ("salt", "prime", "bits", "rounds", "transform")
+
+    def __init__(
+        self,
+        salt: int | None = None,
+        prime: int | None = None,
+        bits: int = 32,
+        rounds: int = 4,
+    ):
+        """Create a Feistel cipher.
+
+        Args:
+            salt: Any number to salt the `F(x)`. Random if None.
+            prime: A small prime for `F(x)`. Random if None.
+            bits: Bits in the number domain, default(32).
+            rounds: The number of times `F(x)` is called, default(4).
+
+        For bits > 64, you need a larger prime. If should be at least one
+        fourth of the total domain bytes transforming small numbers.  For
+        example if bits=128, the prime should be 8 bytes.  For UUIDs and
+        other 128 or 256-bit IDs, `obscure.wide.WideCipher` is faster.
 
-    For bits > 64, you need a larger prime. If should be at least one
-    fourth of the total domain bytes transforming small numbers.  For
-    example if bits=128, the prime should be 8 bytes.
+        Raises:
+            ValueError: When bits is not even.
+        """
+        fx = FeistelFx(salt, prime)
+        self.salt: int
+        self.prime: int
+        self.salt, self.prime = fx.args
+        self.bits = bits
+        self.rounds = rounds
+        # The bare cipher function, for the hottest loops.
+        self.transform: IntInt = create_feistel_cipher(fx, bits, rounds)
+
+    def __call__(self, value: int) -> int:
+        """Return the transformed value.
+
+        Raises:
+            ValueError: When value outside the domain.
+        """
+        return self.transform(value)
+
+    def __repr__(self) -> str:
+        """Return the expression to create this cipher."""
+        return (
+            f"{type(self).__name__}(salt={self.salt!r}, prime={self.prime!r}, "
+            f"bits={self.bits!r}, rounds={self.rounds!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Ciphers with the same parameters are equal."""
+        if not isinstance(other, FeistelCipher):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __hash__(self) -> int:
+        """Hash of the parameters."""
+        return hash((self.salt, self.prime, self.bits, self.rounds))
+
+    def __reduce__(self):
+        """Pickle the parameters, not the cipher function."""
+        return (type(self), (self.salt, self.prime, self.bits, self.rounds))
+
+    def to_dict(self) -> typing.Dict[str, int]:
+        """Return the cipher parameters."""
+        return {
+            "salt": self.salt,
+            "prime": self.prime,
+            "bits": self.bits,
+            "rounds": self.rounds,
+        }
+
+    @classmethod
+    def from_dict(cls, params: typing.Mapping[str, int]) -> FeistelCipher:
+        """Return the cipher for parameters from `to_dict`."""
+        return cls(params["salt"], params["prime"], params["bits"], params["rounds"])
+
+    def to_bytes(self) -> bytes:
+        """Return the cipher parameters packed into a few bytes.
+
+        The layout is bits and rounds as 16-bit unsigned integers, then
+        salt and prime as a length byte and signed big-endian bytes.
+        """
+        packed = bytearray(
+            self.bits.to_bytes(2, "big") + self.rounds.to_bytes(2, "big")
+        )
+        for number in (self.salt, self.prime):
+            size = number.bit_length() // 8 + 1
+            packed.append(size)
+            packed += number.to_bytes(size, "big", signed=True)
+        return bytes(packed)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> FeistelCipher:
+        """Return the cipher for bytes from `to_bytes`.
+
+        Raises:
+            ValueError: When data is not from `to_bytes`.
+        """
+        bits = int.from_bytes(data[0:2], "big")
+        rounds = int.from_bytes(data[2:4], "big")
+        numbers = []
+        offset = 4
+        for _ in range(2):
+            if offset >= len(data):
+                raise ValueError("Invalid FeistelCipher bytes")
+            size = data[offset]
+            numbers.append(
+                int.from_bytes(data[offset + 1 : offset + 1 + size], "big", signed=True)
+            )
+            offset += 1 + size
+        if offset != len(data):
+            raise ValueError("Invalid FeistelCipher bytes")
+        return cls(numbers[0], numbers[1], bits, rounds)
+
+    def transform_array(self, values, out=None):
+        """Transform an array of numbers at once, NumPy required.
+
+        See `obscure.arrays.transform_array`.
+        """
+        from .arrays import transform_array
+
+        return transform_array(
+            values, self.salt, self.prime, self.bits, self.rounds, out=out
+        )
+
+    def transform_range(
+        self, start: int, stop: int, chunk: int = 65536, as_array: bool = False
+    ) -> typing.Iterator:
+        """Lazily transform `range(start, stop)` a chunk at a time.
+
+        Issue a block of IDs with one call per chunk rather than per
+        number.
+
+        Example:
+            >>> cipher = FeistelCipher(4049, 49409)
+            >>> list(cipher.transform_range(0, 3, chunk=2))
+            [[2161199488, 489678117], [1713035285]]
+
+        Args:
+            start: The first number.
+            stop: One past the last number.
+            chunk: Numbers in each chunk, default(65536).
+            as_array: Yield NumPy arrays rather than lists, NumPy
+                required. See `obscure.arrays.transform_range`.
+
+        Returns:
+            An iterator of lists, or arrays, of the transformed numbers.
+
+        Raises:
+            ValueError: When the range is outside the domain.
+        """
+        if as_array:
+            from .arrays import transform_range
+
+            return transform_range(
+                start, stop, self.salt, self.prime, self.bits, self.rounds, chunk
+            )
+        return _transform_range(self.transform, 1 << self.bits, start, stop, chunk)
+
+
+def key_schedule(
+    key: bytes | str, rounds: int, bits: int = 32
+) -> typing.Tuple[int, ...]:
+    """Derive one subkey per round from a master key.
+
+    Each subkey is a BLAKE2b digest of the key personalized for its
+    round, so subkeys are independent and the schedule is repeatable.
+
+    Args:
+        key: The master key; a str is UTF-8 encoded.
+        rounds: The number of subkeys.
+        bits: Bits in the number domain.  Subkeys are 64 bits, or half
+            the domain when wider.
 
     Returns:
-            A Feistel cipher function.
+        A tuple of the subkeys in round order.
+    """
+    import hashlib
+
+    if isinstance(key, str):
+        key = key.encode()
+    size = min(64, max(8, (bits // 2 + 7) // 8))
+    return tuple(
+        int.from_bytes(
+            hashlib.blake2b(
+                key,
+                digest_size=size,
+                person=b"obscure.round",
+                salt=_.to_bytes(8, "big"),
+            ).digest(),
+            "big",
+        )
+        for _ in range(rounds)
+    )
+
+
+class KeyedCipher:
+    """A Feistel cipher with a subkey per round from a master key.
+
+    The subkey schedule is derived once, then built into the cipher
+    function like the salt of a `FeistelCipher`, so each call costs the
+    same.  Unlike `FeistelCipher` it is not its own inverse; use
+    `inverse`, which applies the subkeys in reverse order.  An `Encoder`
+    does so when decoding.
 
-    Raises:
-        ValueError: When value outside the domain.
+    Example:
+        >>> cipher = KeyedCipher("master key", 49409)
+        >>> cipher(101038)
+        2506181153
+        >>> cipher.inverse(2506181153)
+        101038
     """
-    return create_feistel_cipher(FeistelFx(salt, prime), bits, rounds)
+
+    __slots__ = ("key", "prime", "bits", "rounds", "keys", "transform", "inverse")
+
+    def __init__(
+        self,
+        key: bytes | str,
+        prime: int | None = None,
+        bits: int = 32,
+        rounds: int = 4,
+    ):
+        """Create a round keyed Feistel cipher.
+
+        Args:
+            key: The master key; a str is UTF-8 encoded.
+            prime: A small prime for `F(x)`.  Chosen by the key if None.
+            bits: Bits in the number domain, default(32).
+            rounds: The number of rounds and subkeys, default(4).
+
+        As with `FeistelCipher`, for bits > 64 give a larger prime.
+
+        Raises:
+            ValueError: When the key is empty or bits is not even.
+        """
+        if isinstance(key, str):
+            key = key.encode()
+        if not key:
+            raise ValueError("key must not be empty")
+        if not isinstance(bits, int) or 1 == bits % 2:
+            raise ValueError("bits must be an even integer, usually 32 or 64.")
+        if prime is None:
+            import hashlib
+
+            digest = hashlib.blake2b(key, digest_size=8, person=b"obscure.prime")
+            prime = _primes[int.from_bytes(digest.digest(), "big") % len(_primes)]
+        self.key: bytes = key
+        self.prime: int = prime
+        self.bits = bits
+        self.rounds = rounds
+        self.keys = key_schedule(key, rounds, bits)
+        # The bare cipher functions, for the hottest loops.
+        self.transform: IntInt = _default_cipher(self.keys, prime, bits, rounds)
+        self.inverse: IntInt = _default_cipher(self.keys[::-1], prime, bits, rounds)
+
+    def __call__(self, value: int) -> int:
+        """Return the transformed value, undone by `inverse`.
+
+        Raises:
+            ValueError: When value outside the domain.
+        """
+        return self.transform(value)
+
+    def __repr__(self) -> str:
+        """Return the parameters, hiding the key."""
+        return (
+            f"{type(self).__name__}(key=..., prime={self.prime!r}, "
+            f"bits={self.bits!r}, rounds={self.rounds!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Ciphers with the same parameters are equal."""
+        if not isinstance(other, KeyedCipher):
+            return NotImplemented
+        return (self.key, self.prime, self.bits, self.rounds) == (
+            other.key,
+            other.prime,
+            other.bits,
+            other.rounds,
+        )
+
+    def __hash__(self) -> int:
+        """Hash of the parameters."""
+        return hash((self.key, self.prime, self.bits, self.rounds))
+
+    def __reduce__(self):
+        """Pickle the parameters, not the cipher functions."""
+        return (type(self), (self.key, self.prime, self.bits, self.rounds))
+
+    def transform_array(self, values, out=None):
+        """Transform an array of numbers at once, NumPy required.
+
+        See `obscure.arrays.transform_array`.
+        """
+        from .arrays import transform_array
+
+        return transform_array(
+            values, self.keys, self.prime, self.bits, self.rounds, out=out
+        )
+
+    def inverse_array(self, values, out=None):
+        """Undo `transform_array`, NumPy required."""
+        from .arrays import transform_array
+
+        return transform_array(
+            values, self.keys[::-1], self.prime, self.bits, self.rounds, out=out
+        )
+
+    def transform_range(
+        self, start: int, stop: int, chunk: int = 65536, as_array: bool = False
+    ) -> typing.Iterator:
+        """Lazily transform `range(start, stop)` a chunk at a time.
+
+        See `FeistelCipher.transform_range`.
+        """
+        if as_array:
+            from .arrays import transform_range
+
+            return transform_range(
+                start, stop, self.keys, self.prime, self.bits, self.rounds, chunk
+            )
+        return _transform_range(self.transform, 1 << self.bits, start, stop, chunk)
+
+
+def _domain_size(cipher: typing.Any) -> int | float:
+    """Return how many numbers the cipher permutes, infinite if unknown."""
+    n = getattr(cipher, "n", None)
+    if isinstance(n, int):
+        return n
+    if hasattr(cipher, "__len__"):
+        return len(cipher)
+    # A bound method, such as the C cipher's transform, has its owner's
+    bits = getattr(
+        cipher, "bits", getattr(getattr(cipher, "__self__", None), "bits", None)
+    )
+    return 1 << bits if isinstance(bits, int) else math.inf
 
 
 class Encoder:
     """Bidirectional transfrom between integer and string."""
 
-    def __init__(self, feistel: IntInt | None, encoding: str = ""):
+    def __init__(self, feistel: IntInt | None, encoding: str = "", fixed_bits: int = 0):
         """Create an encoder/decoder using a Feistel cipher.
 
         Args:
             feistel: A Feistel cipher function or create a random cipher.
             encoding: One of "base32", "base64", or "hex"
+            fixed_bits: The cipher's bits to encode every number with
+                the same length, default(0) for the shortest.
+
+        Raises:
+            ValueError: When the encoding is unknown, or fixed_bits is
+                fewer than the bits of a cipher's known domain.
         """
         if feistel is None:
-            self.func = FeistelCipher(None, 32)
-        elif callable(feistel):
-            self.func = feistel
-        else:
+            feistel = FeistelCipher(bits=32)
+        elif not callable(feistel):
             raise ValueError("feistel is neither a FeistelCipher nor None")
+        self.cipher = feistel
+        self._bind_cipher()
+        self._limit = _domain_size(feistel)
+        if fixed_bits and isinstance(self._limit, int):
+            bits = (self._limit - 1).bit_length()
+            if fixed_bits < bits:
+                raise ValueError(f"fixed_bits must be at least the cipher's {bits}")
+        table = fixed_encodings(fixed_bits) if fixed_bits else encodings
         try:
-            self.encoder, self.decoder = encodings[encoding]
+            self.encoder, self.decoder = table[encoding]
         except KeyError as ex:
             raise ValueError(
                 f"{ex!r} is not one of {[str(_) for _ in encodings.keys()]!r}"
             ) from ex
+        bytes_table = (
+            fixed_encodings(fixed_bits, True) if fixed_bits else bytes_encodings
+        )
+        self.bytes_encoder, self.bytes_decoder = bytes_table[encoding]
+        # What `is_valid` and `try_decode` accept, checked before any cipher work
+        self._try_decoder = try_decoders[encoding]
+        # The "num" encoder returns an int
+        longest = (
+            len(str(self.encoder(self._limit - 1)))
+            if isinstance(self._limit, int)
+            else sys.maxsize - 1
+        )
+        self._lengths = range(len(str(self.encoder(0))), longest + 1)
+
+    def __getstate__(self) -> typing.Dict[str, typing.Any]:
+        """Pickle the cipher, not its unpicklable function."""
+        state = self.__dict__.copy()
+        del state["func"], state["inverse"]
+        return state
+
+    def __setstate__(self, state: typing.Dict[str, typing.Any]) -> None:
+        """Restore the cipher and its function."""
+        self.__dict__.update(state)
+        self._bind_cipher()
+
+    def _bind_cipher(self) -> None:
+        """Set the functions to transform with and to undo the transform.
+
+        A cipher with an `inverse` method is undone by it; otherwise the
+        cipher is its own inverse, as a `FeistelCipher` is.
+        """
+        cipher = self.cipher
+        # Skip the cipher's __call__ on the hot path; its bare function
+        # also has the `batch` that `encode_range` uses.
+        transform = getattr(cipher, "transform", None)
+        self.func = transform if callable(transform) else cipher
+        self.inverse = getattr(cipher, "inverse", self.func)
 
     def transform(self, number: int) -> int:
         """Reversibly transform an integer.
@@ -198,7 +856,333 @@ class Encoder:
         Returns:
             The number.
         """
-        return self.transform(self.decoder(text))
+        return self.inverse(self.decoder(text))
+
+    def encode_bytes(self, number: int) -> bytes:
+        """Return the number transformed and encoded as ASCII bytes.
+
+        The same token as `encode`, without creating a str, for bytes
+        based protocols.
+        """
+        return self.bytes_encoder(self.func(number))
+
+    def decode_bytes(self, data: bytes) -> int:
+        """Return the number from ASCII bytes, `bytes` or `bytearray`."""
+        return self.inverse(self.bytes_decoder(data))
+
+    def encode_into(self, number: int, buffer: bytearray | memoryview, offset=0) -> int:
+        """Write the transformed and encoded number into a buffer.
+
+        Assemble a response in one preallocated buffer without any
+        intermediate str.
+
+        Args:
+            number: to transform
+            buffer: A writable byte buffer, such as a `bytearray`.
+            offset: Where in buffer the token starts.
+
+        Returns:
+            The offset just after the token.
+
+        Raises:
+            ValueError: When the token does not fit in buffer at offset.
+        """
+        data = self.bytes_encoder(self.func(number))
+        end = offset + len(data)
+        if offset < 0 or end > len(buffer):
+            raise ValueError("buffer too small for the token")
+        buffer[offset:end] = data
+        return end
+
+    def is_valid(self, text: str) -> bool:
+        """Return whether text decodes to a number within the domain.
+
+        Only the length, the alphabet and the decoded number are
+        checked, without any cipher work or raising exceptions, to
+        cheaply reject junk such as tokens from crawlers.  The domain is
+        known for the package's ciphers and the functions from
+        `create_feistel_cipher`; any other cipher function without a
+        `bits` attribute is not range checked.
+
+        Args:
+            text: The untrusted encoded string.
+
+        Returns:
+            True when `decode` would succeed.
+        """
+        return self._check(text) is not None
+
+    def try_decode(self, text: str) -> int | None:
+        """Return the decoded and transformed number, None if text is invalid.
+
+        Unlike `decode`, only the characters the encoder emits are valid;
+        there is no surrounding whitespace, sign or base64 padding.
+
+        Args:
+            text: The untrusted encoded string.
+
+        Returns:
+            The number, or None without running the cipher when invalid.
+        """
+        # Inlines `_check` to save a call on the valid path
+        if len(text) not in self._lengths:
+            return None
+        number = self._try_decoder(text)
+        if number is None or number >= self._limit:
+            return None
+        try:
+            return self.inverse(number)
+        except ValueError:  # A cipher function with no known domain
+            return None
+
+    def _check(self, text: str) -> int | None:
+        """Return the decoded, still transformed, number if within the domain."""
+        if len(text) not in self._lengths:
+            return None
+        number = self._try_decoder(text)
+        if number is None or number >= self._limit:
+            return None
+        return number
+
+    def encode_many(self, numbers: typing.Iterable[int]) -> typing.Iterator[str]:
+        """Lazily transform and encode many numbers.
+
+        The cipher and encoder are looked up once for the whole batch
+        rather than once per number.
+
+        Args:
+            numbers: Any iterable of numbers, including a generator.
+
+        Returns:
+            An iterator of the transformed, encoded numbers.
+        """
+        return map(self.encoder, map(self.func, numbers))
+
+    def encode_range(
+        self, start: int, stop: int, chunk: int = 65536
+    ) -> typing.Iterator[typing.List[str]]:
+        """Lazily transform and encode `range(start, stop)` a chunk at a time.
+
+        With the C extension each chunk is transformed in one call.
+
+        Args:
+            start: The first number.
+            stop: One past the last number.
+            chunk: Numbers in each chunk, default(65536).
+
+        Returns:
+            An iterator of lists of the transformed, encoded numbers.
+
+        Raises:
+            ValueError: When the range is outside the cipher's domain.
+        """
+        encoder = self.encoder
+        chunks = _transform_range(self.func, self._limit, start, stop, chunk)
+        return (list(map(encoder, _)) for _ in chunks)
+
+    def decode_many(self, texts: typing.Iterable[str]) -> typing.Iterator[int]:
+        """Lazily decode and transform many strings.
+
+        Args:
+            texts: Any iterable of encoded strings, including a generator.
+
+        Returns:
+            An iterator of the numbers.
+        """
+        return map(self.inverse, map(self.decoder, texts))
+
+    async def aencode_many(
+        self,
+        numbers: typing.Iterable[int],
+        executor: concurrent.futures.Executor | None = None,
+        threshold: int = OFFLOAD_THRESHOLD,
+    ) -> typing.List[str]:
+        """Transform and encode many numbers without blocking the event loop.
+
+        Small batches run inline; bigger ones run in an executor.  A
+        process executor needs a picklable encoder and cipher, such as
+        `Encoder` with a `FeistelCipher`.
+
+        Args:
+            numbers: Any iterable of numbers.
+            executor: Where big batches run, default(the loop's default
+                thread pool).
+            threshold: Batches this size or larger go to the executor.
+
+        Returns:
+            A list of the transformed, encoded numbers.
+        """
+        numbers = list(numbers)
+        if len(numbers) < threshold:
+            return list(self.encode_many(numbers))
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._encode_list, numbers)
+
+    async def adecode_many(
+        self,
+        texts: typing.Iterable[str],
+        executor: concurrent.futures.Executor | None = None,
+        threshold: int = OFFLOAD_THRESHOLD,
+    ) -> typing.List[int]:
+        """Decode and transform many strings without blocking the event loop.
+
+        See `aencode_many`.
+
+        Returns:
+            A list of the numbers.
+        """
+        texts = list(texts)
+        if len(texts) < threshold:
+            return list(self.decode_many(texts))
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._decode_list, texts)
+
+    def _encode_list(self, numbers: typing.List[int]) -> typing.List[str]:
+        """Return encode_many as a list, for an executor."""
+        return list(self.encode_many(numbers))
+
+    def _decode_list(self, texts: typing.List[str]) -> typing.List[int]:
+        """Return decode_many as a list, for an executor."""
+        return list(self.decode_many(texts))
+
+
+class CacheInfo(typing.NamedTuple):
+    """Statistics of one `CachedEncoder` cache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    currsize: int
+    maxsize: int
+
+
+_missing = object()
+
+
+class _LRUCache:
+    """Thread-safe least recently used cache with statistics."""
+
+    __slots__ = ("_data", "_lock", "maxsize", "hits", "misses", "evictions")
+
+    def __init__(self, maxsize: int):
+        self._data: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: typing.Any, compute: typing.Callable) -> typing.Any:
+        """Return the cached value for key or cache compute(key)."""
+        with self._lock:
+            value = self._data.get(key, _missing)
+            if value is not _missing:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        # Compute outside the lock; a racing thread may compute it too.
+        value = compute(key)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return value
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def info(self) -> CacheInfo:
+        """Return the cache statistics."""
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, self.evictions, len(self._data), self.maxsize
+            )
+
+    def clear(self) -> None:
+        """Empty the cache and reset statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+class CachedEncoder(Encoder):
+    """An `Encoder` remembering recent results in each direction.
+
+    Useful when a few hot numbers are encoded and decoded over and over.
+    The caches are bounded least recently used caches, safe to share
+    across threads.  Invalid input raises and is not cached.
+
+    Example:
+        >>> encoder = CachedEncoder(FeistelCipher(4049, 49409), "hex", 2)
+        >>> [encoder.encode(_) for _ in (1, 1, 2, 3)]
+        ['1d2fe525', '1d2fe525', '661ad815', '20c627db']
+        >>> encoder.cache_info()["encode"]
+        CacheInfo(hits=1, misses=3, evictions=1, currsize=2, maxsize=2)
+    """
+
+    def __init__(
+        self,
+        feistel: IntInt | None,
+        encoding: str = "",
+        cache_size: int = 1024,
+        fixed_bits: int = 0,
+    ):
+        """Create a caching encoder/decoder using a Feistel cipher.
+
+        Args:
+            feistel: A Feistel cipher function or create a random cipher.
+            encoding: One of "base32", "base64", or "hex"
+            cache_size: Most results kept in each direction, default(1024).
+            fixed_bits: The cipher's bits to encode every number with
+                the same length, default(0) for the shortest.
+        """
+        if not isinstance(cache_size, int) or cache_size < 1:
+            raise ValueError("cache_size must be a positive integer")
+        super().__init__(feistel, encoding, fixed_bits)
+        self._encoded = _LRUCache(cache_size)
+        self._decoded = _LRUCache(cache_size)
+
+    def __getstate__(self) -> typing.Dict[str, typing.Any]:
+        """Pickle the cache sizes, not the caches and their locks."""
+        state = super().__getstate__()
+        state["_encoded"] = self._encoded.maxsize
+        state["_decoded"] = self._decoded.maxsize
+        return state
+
+    def __setstate__(self, state: typing.Dict[str, typing.Any]) -> None:
+        """Restore the encoder with empty caches."""
+        state["_encoded"] = _LRUCache(state["_encoded"])
+        state["_decoded"] = _LRUCache(state["_decoded"])
+        super().__setstate__(state)
+
+    def encode(self, number: int) -> str:
+        """Return the number transformed and encoded, cached."""
+        return self._encoded.get(number, super().encode)
+
+    def decode(self, text: str) -> int:
+        """Return the decoded and transformed number, cached."""
+        return self._decoded.get(text, super().decode)
+
+    def encode_many(self, numbers: typing.Iterable[int]) -> typing.Iterator[str]:
+        """Lazily transform and encode many numbers through the cache."""
+        return map(self.encode, numbers)
+
+    def decode_many(self, texts: typing.Iterable[str]) -> typing.Iterator[int]:
+        """Lazily decode and transform many strings through the cache."""
+        return map(self.decode, texts)
+
+    def cache_info(self) -> typing.Dict[str, CacheInfo]:
+        """Return the statistics of the "encode" and "decode" caches."""
+        return {"encode": self._encoded.info(), "decode": self._decoded.info()}
+
+    def cache_clear(self) -> None:
+        """Empty both caches and reset their statistics."""
+        self._encoded.clear()
+        self._decoded.clear()
 
 
 # https://t5k.org/lists/small/1000.txt
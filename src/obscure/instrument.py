@@ -0,0 +1,225 @@
+"""Opt-in instrumentation of encoders and ciphers.
+
+`instrument` returns a copy of an `Encoder` whose cipher and string
+encoding steps report to a `Recorder`: how long each call took and
+which calls raised.  The original encoder is untouched, so code that
+does not use instrumentation pays nothing for it.
+
+Operations reported by an instrumented `Encoder`:
+    transform: the cipher, when encoding
+    inverse: the cipher, when decoding
+    encode: number to string, such as `base32_encode`
+    decode: string to number, such as `base32_decode`
+
+Recorders:
+    Metrics: in-memory counters, error counts and latency histograms.
+    CallbackRecorder: call your own functions.
+    StatsdRecorder: a statsd style client with `timing` and `incr`.
+    PrometheusRecorder: a labelled Prometheus style histogram and counter.
+
+Example:
+    >>> from obscure import Encoder, FeistelCipher
+    >>> metrics = Metrics()
+    >>> encoder = instrument(Encoder(FeistelCipher(), "base32"), metrics)
+    >>> encoder.decode(encoder.encode(101038))
+    101038
+    >>> try:
+    ...     encoder.decode("ILOU")
+    ... except ValueError:
+    ...     pass
+    >>> {op: (_["count"], _["errors"]) for op, _ in metrics.snapshot().items()}
+    {'transform': (1, 0), 'encode': (1, 0), 'decode': (2, 1), 'inverse': (1, 0)}
+"""
+
+from __future__ import annotations  # Remove when supporting python3.10+
+
+import bisect
+import copy
+import functools
+import threading
+import time
+import typing
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from .feistel import Encoder
+
+T = typing.TypeVar("T")
+R = typing.TypeVar("R")
+
+# Latency histogram upper bounds in seconds
+DEFAULT_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 1e-3, float("inf"))
+
+
+class Recorder(typing.Protocol):
+    """Receives measurements from instrumented calls."""
+
+    def observe(self, operation: str, seconds: float) -> None:
+        """Record one call of operation and how long it took."""
+
+    def error(self, operation: str, exc: BaseException) -> None:
+        """Record a call of operation that raised exc."""
+
+
+def timed(
+    operation: str, func: typing.Callable[[T], R], recorder: Recorder
+) -> typing.Callable[[T], R]:
+    """Wrap a one argument function to report to recorder.
+
+    Args:
+        operation: The name reported for each call.
+        func: The function to measure, such as a cipher.
+        recorder: Where measurements go.
+
+    Returns:
+        A function calling func and recording each call.
+    """
+    observe, error, clock = recorder.observe, recorder.error, time.perf_counter
+
+    # Not func's __dict__: a copied `batch` would bypass the recorder.
+    @functools.wraps(func, updated=())
+    def wrapper(value: T) -> R:
+        start = clock()
+        try:
+            result = func(value)
+        except Exception as ex:
+            error(operation, ex)
+            raise
+        observe(operation, clock() - start)
+        return result
+
+    return wrapper
+
+
+def instrument(encoder: Encoder, recorder: Recorder) -> Encoder:
+    """Return a copy of encoder reporting each step to recorder.
+
+    Every method, including `encode_many` and the async methods, goes
+    through the instrumented steps.
+    """
+    instrumented = copy.copy(encoder)
+    instrumented.func = timed("transform", encoder.func, recorder)
+    instrumented.inverse = timed("inverse", encoder.inverse, recorder)
+    instrumented.encoder = timed("encode", encoder.encoder, recorder)
+    instrumented.decoder = timed("decode", encoder.decoder, recorder)
+    instrumented.bytes_encoder = timed("encode", encoder.bytes_encoder, recorder)
+    instrumented.bytes_decoder = timed("decode", encoder.bytes_decoder, recorder)
+    return instrumented
+
+
+class Metrics:
+    """Thread-safe in-memory counters and latency histograms."""
+
+    def __init__(self, buckets: typing.Sequence[float] = DEFAULT_BUCKETS):
+        """Create empty metrics.
+
+        Args:
+            buckets: Ascending histogram upper bounds in seconds, the
+                last usually infinity.
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._stats: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+
+    def _get(self, operation: str) -> typing.Dict[str, typing.Any]:
+        stats = self._stats.get(operation)
+        if stats is None:
+            stats = {"count": 0, "errors": 0, "seconds": 0.0}
+            stats["histogram"] = [0] * len(self.buckets)
+            self._stats[operation] = stats
+        return stats
+
+    def observe(self, operation: str, seconds: float) -> None:
+        """Record one call of operation and how long it took."""
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            stats = self._get(operation)
+            stats["count"] += 1
+            stats["seconds"] += seconds
+            if index < len(self.buckets):
+                stats["histogram"][index] += 1
+
+    def error(self, operation: str, exc: BaseException) -> None:
+        """Record a call of operation that raised exc."""
+        with self._lock:
+            stats = self._get(operation)
+            stats["count"] += 1
+            stats["errors"] += 1
+
+    def snapshot(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """Return a copy of the statistics for each operation.
+
+        Each has "count", "errors", total "seconds" and "histogram",
+        keyed by bucket bound, counting the successful calls slower than
+        the previous bound and no slower than this one.  Calls slower
+        than the last bound, when it is not infinity, are only counted
+        in "count".
+        """
+        with self._lock:
+            return {
+                operation: {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "seconds": stats["seconds"],
+                    "histogram": dict(zip(self.buckets, stats["histogram"])),
+                }
+                for operation, stats in self._stats.items()
+            }
+
+    def reset(self) -> None:
+        """Forget everything recorded."""
+        with self._lock:
+            self._stats.clear()
+
+
+class CallbackRecorder:
+    """Pass measurements to your own functions."""
+
+    def __init__(
+        self,
+        on_observe: typing.Callable[[str, float], None],
+        on_error: typing.Callable[[str, BaseException], None] | None = None,
+    ):
+        """Create a recorder calling on_observe(operation, seconds) and
+        on_error(operation, exception) when given."""
+        self.observe = on_observe  # type: ignore
+        self.error = on_error or (lambda operation, exc: None)  # type: ignore
+
+
+class StatsdRecorder:
+    """Adapter for a statsd style client with `timing` and `incr`."""
+
+    def __init__(self, client: typing.Any, prefix: str = "obscure"):
+        """Report as `{prefix}.{operation}` timings in milliseconds and
+        `{prefix}.{operation}.errors` counts."""
+        self.client = client
+        self.prefix = prefix
+
+    def observe(self, operation: str, seconds: float) -> None:
+        """Send the timing in milliseconds."""
+        self.client.timing(f"{self.prefix}.{operation}", seconds * 1000)
+
+    def error(self, operation: str, exc: BaseException) -> None:
+        """Count the error."""
+        self.client.incr(f"{self.prefix}.{operation}.errors")
+
+
+class PrometheusRecorder:
+    """Adapter for Prometheus style metrics labelled by operation."""
+
+    def __init__(self, histogram: typing.Any, errors: typing.Any):
+        """Report to histogram and errors, both with an "operation" label.
+
+        For example with prometheus_client:
+            Histogram("obscure_seconds", "Latency", ["operation"])
+            Counter("obscure_errors", "Errors", ["operation"])
+        """
+        self.histogram = histogram
+        self.errors = errors
+
+    def observe(self, operation: str, seconds: float) -> None:
+        """Observe the latency."""
+        self.histogram.labels(operation=operation).observe(seconds)
+
+    def error(self, operation: str, exc: BaseException) -> None:
+        """Count the error."""
+        self.errors.labels(operation=operation).inc()
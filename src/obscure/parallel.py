@@ -0,0 +1,109 @@
+"""Parallel batch transformation.
+
+Spread a large stream of numbers or encoded strings across a pool of
+worker processes.  Each worker builds its own `Encoder` once from the
+cipher parameters rather than unpickling it with every chunk.
+Input is read in chunks with only a few chunks in flight per worker,
+so memory stays bounded and results come back in input order.
+
+Example:
+    >>> texts = list(transform_parallel(range(5), 4049, 49409, encoding="hex"))
+    >>> texts[:2]
+    ['80d14980', '1d2fe525']
+    >>> list(transform_parallel(texts, 4049, 49409, encoding="hex", decode=True))
+    [0, 1, 2, 3, 4]
+"""
+
+from __future__ import annotations  # Remove when supporting python3.10+
+
+import collections
+import concurrent.futures
+import itertools
+import os
+import typing
+
+from .feistel import Encoder, FeistelCipher, FeistelFx
+
+_encoder: Encoder | None = None
+_decode = False
+
+
+def _init_worker(
+    salt: int,
+    prime: int,
+    bits: int,
+    rounds: int,
+    encoding: str,
+    fixed_bits: int,
+    decode: bool,
+) -> None:
+    """Build the worker's own encoder from the cipher parameters."""
+    global _encoder, _decode
+    _encoder = Encoder(FeistelCipher(salt, prime, bits, rounds), encoding, fixed_bits)
+    _decode = decode
+
+
+def _work(chunk: typing.List) -> typing.List:
+    """Transform one chunk in a worker."""
+    assert _encoder is not None
+    if _decode:
+        return list(_encoder.decode_many(chunk))
+    return list(_encoder.encode_many(map(int, chunk)))
+
+
+def transform_parallel(
+    values: typing.Iterable,
+    salt: int | None,
+    prime: int | None,
+    bits: int = 32,
+    rounds: int = 4,
+    encoding: str = "num",
+    decode: bool = False,
+    fixed_bits: int = 0,
+    workers: int | None = None,
+    chunk_size: int = 10_000,
+) -> typing.Iterator:
+    """Lazily encode or decode values across worker processes.
+
+    Args:
+        values: Numbers, or their decimal strings, to encode; or the
+            encoded strings to decode.  Any iterable, including a file.
+        salt: Any number to salt the `F(x)`. Random if None.
+        prime: A small prime for `F(x)`. Random if None.
+        bits: Bits in the number domain, default(32).
+        rounds: The number of times `F(x)` is called, default(4).
+        encoding: One of the `encodings`, default("num").
+        decode: Decode the values rather than encode them.
+        fixed_bits: The cipher's bits to encode every number with
+            the same length, default(0) for the shortest.
+        workers: Number of processes, default(os.cpu_count()).
+        chunk_size: Values sent to a worker at a time.
+
+    Returns:
+        An iterator of results in the order of values.
+    """
+    # Settle random parameters once so every worker uses the same cipher
+    salt, prime = FeistelFx(salt, prime).args
+    # Fail here, not in every worker, on bad parameters
+    Encoder(FeistelCipher(salt, prime, bits, rounds), encoding, fixed_bits)
+    workers = workers or os.cpu_count() or 1
+    initargs = (salt, prime, bits, rounds, encoding, fixed_bits, decode)
+    return _ordered_results(values, workers, chunk_size, initargs)
+
+
+def _ordered_results(
+    values: typing.Iterable, workers: int, chunk_size: int, initargs: tuple
+) -> typing.Iterator:
+    """Yield results of the chunks in order, keeping the pool busy."""
+    iterator = iter(values)
+    chunks = iter(lambda: list(itertools.islice(iterator, chunk_size)), [])
+    pending: collections.deque = collections.deque()
+    with concurrent.futures.ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=initargs
+    ) as pool:
+        for chunk in chunks:
+            pending.append(pool.submit(_work, chunk))
+            if len(pending) > 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,177 @@
+"""Key versioned encoders for rotating cipher parameters.
+
+Changing the salt and prime of a cipher breaks every token issued under
+the old ones.  A registry holds every version of the cipher parameters,
+encodes with the current one, and starts each token with the tag of its
+version.  Decoding looks the tag up in a dict and goes straight to that
+version's encoder rather than trying each cipher in turn.
+
+Versions are registered as parameters or factories; the cipher and its
+`Encoder` are built on first use and kept.  A cipher already built may
+be registered too.  A registry with dozens of
+retired keys costs little until an old token actually arrives.
+
+Example:
+    >>> from obscure import FeistelCipher, KeyedCipher
+    >>> registry = EncoderRegistry("base32")
+    >>> registry.register("A", FeistelCipher(4049, 49409).to_dict())
+    >>> registry.register("B", lambda: KeyedCipher("2024 key", 49409))
+    >>> registry.current = "A"
+    >>> old = registry.encode(101038)
+    >>> registry.current = "B"
+    >>> new = registry.encode(101038)
+    >>> old, new
+    ('ACF6SQ6G', 'BK18J8NG')
+    >>> registry.decode(old), registry.decode(new)
+    (101038, 101038)
+"""
+
+from __future__ import annotations  # Remove when supporting python3.10+
+
+import functools
+import typing
+
+from .encoder import encodings
+from .feistel import Encoder, FeistelCipher, IntInt, _domain_size
+
+CipherFactory = typing.Callable[[], IntInt]
+
+
+class EncoderRegistry:
+    """Encoders for several versions of cipher parameters, by version tag."""
+
+    def __init__(self, encoding: str, fixed_bits: int = 0):
+        """Create an empty registry.
+
+        Args:
+            encoding: One of the `encodings` for every version.
+            fixed_bits: The cipher's bits to encode every number with
+                the same length, default(0) for the shortest.
+        """
+        if encoding not in encodings:
+            raise ValueError(f"{encoding!r} is not one of {list(encodings)!r}")
+        self.encoding = encoding
+        self.fixed_bits = fixed_bits
+        self._factories: typing.Dict[str, CipherFactory | IntInt] = {}
+        self._encoders: typing.Dict[str, Encoder] = {}
+        self._tag_length = 0
+        self._current: str | None = None
+
+    def register(
+        self,
+        version: str,
+        cipher: CipherFactory | typing.Mapping[str, int],
+    ) -> None:
+        """Add a version of the cipher, built when first used.
+
+        The first version registered is current until `current` is set.
+
+        Args:
+            version: The tag starting each token.  Every tag in a
+                registry has the same length, usually one character.
+            cipher: A function of no arguments returning the cipher, the
+                parameters of a `FeistelCipher` from
+                `FeistelCipher.to_dict`, or a cipher of known domain or
+                with an `inverse`, such as a `FeistelCipher`, which is
+                used as is.
+
+        Raises:
+            ValueError: When the tag is already used or has another
+                length, or the cipher does not suit the registry's
+                encoding.
+        """
+        if not isinstance(version, str) or not version:
+            raise ValueError("version must be a non-empty str")
+        if self._tag_length and len(version) != self._tag_length:
+            raise ValueError(f"version tags must be {self._tag_length} long")
+        if version in self._factories:
+            raise ValueError(f"version {version!r} is already registered")
+        if isinstance(cipher, typing.Mapping):
+            cipher = functools.partial(FeistelCipher.from_dict, dict(cipher))
+        elif _is_cipher(cipher):
+            # Already built, so is its encoder; the cipher is never called.
+            encoder = Encoder(cipher, self.encoding, self.fixed_bits)
+            self._encoders[version] = encoder
+        self._factories[version] = cipher
+        self._tag_length = len(version)
+        if self._current is None:
+            self._current = version
+
+    @property
+    def versions(self) -> typing.List[str]:
+        """The registered version tags, in order."""
+        return list(self._factories)
+
+    @property
+    def current(self) -> str | None:
+        """The version new tokens are encoded with."""
+        return self._current
+
+    @current.setter
+    def current(self, version: str) -> None:
+        if version not in self._factories:
+            raise ValueError(f"version {version!r} is not registered")
+        self._current = version
+
+    def encoder(self, version: str) -> Encoder:
+        """Return the encoder of a version, building it on first use.
+
+        Raises:
+            KeyError: When version is not registered.
+        """
+        encoder = self._encoders.get(version)
+        if encoder is None:
+            cipher = typing.cast(CipherFactory, self._factories[version])()
+            encoder = Encoder(cipher, self.encoding, self.fixed_bits)
+            # Racing threads may both build it; keep just one.
+            encoder = self._encoders.setdefault(version, encoder)
+        return encoder
+
+    def encode(self, number: int) -> str:
+        """Return the number encoded with the current version, tagged.
+
+        Raises:
+            ValueError: When there are no versions.
+        """
+        version = self._current
+        if version is None:
+            raise ValueError("no versions registered")
+        return f"{version}{self.encoder(version).encode(number)}"
+
+    def decode(self, text: str) -> int:
+        """Return the number, decoded by the version its tag names.
+
+        Raises:
+            ValueError: When the tag is unknown or the token invalid.
+        """
+        size = self._tag_length
+        version = text[:size]
+        if version not in self._factories:
+            raise ValueError(f"Unknown version in {text!r}")
+        return self.encoder(version).decode(text[size:])
+
+    def try_decode(self, text: str) -> int | None:
+        """Return the number, or None for an unknown tag or invalid token.
+
+        See `Encoder.try_decode`.
+        """
+        size = self._tag_length
+        version = text[:size]
+        if version not in self._factories:
+            return None
+        return self.encoder(version).try_decode(text[size:])
+
+    def version_of(self, text: str) -> str | None:
+        """Return the version tag of a token, None if not registered.
+
+        Tokens of retired versions can be found and re-issued.
+        """
+        version = text[: self._tag_length]
+        return version if version in self._factories else None
+
+
+def _is_cipher(cipher: typing.Any) -> bool:
+    """Return whether a registered callable is a cipher, not a factory."""
+    if isinstance(cipher, type):
+        return False
+    return hasattr(cipher, "inverse") or isinstance(_domain_size(cipher), int)
@@ -0,0 +1,211 @@
+"""Precomputed permutation tables for small domains.
+
+For 16 to 24 bit domains, such as short invite codes or shard IDs, the
+whole permutation fits in a few megabytes.  Compute it once and every
+transform becomes one indexed load.  Save the table to a file and worker
+processes can memory map it, sharing one copy of the pages instead of
+each building its own.
+
+Example:
+    >>> from obscure import FeistelCipher
+    >>> cipher = FeistelCipher(4049, 49409, bits=16)
+    >>> table = TableCipher.build(cipher)
+    >>> table(101), cipher(101)
+    (7459, 7459)
+    >>> table.inverse(7459)
+    101
+"""
+
+from __future__ import annotations  # Remove when supporting python3.10+
+
+import array
+import mmap
+import struct
+import sys
+import typing
+
+_TYPECODE = "I" if 4 == array.array("I").itemsize else "L"
+# Magic, number of entries, flags
+_HEADER = struct.Struct("<8sQQ")
+_MAGIC = b"OBSCTBL1"
+# Largest table built without an explicit size, 64 MiB a direction
+_DEFAULT_MAX_SIZE = 1 << 24
+_HAS_INVERSE = 1
+
+Table = typing.Union[array.array, memoryview]
+
+
+class TableCipher:
+    """A cipher looking up a precomputed permutation of `[0, size)`."""
+
+    __slots__ = ("_forward", "_backward", "_mmap")
+
+    def __init__(self, forward: Table, backward: Table | None = None):
+        """Create a cipher from permutation tables.
+
+        Use `build` or `load` rather than calling this directly.
+
+        Args:
+            forward: `forward[x]` is the transformed x.
+            backward: `backward[y]` undoes forward.  None when the
+                permutation is its own inverse, as a `FeistelCipher` is.
+        """
+        self._forward = forward
+        self._backward = forward if backward is None else backward
+        self._mmap: mmap.mmap | None = None
+
+    @classmethod
+    def build(cls, cipher: typing.Callable[[int], int], size: int | None = None):
+        """Compute the permutation of a cipher.
+
+        Uses the cipher's NumPy `transform_array` when available.
+
+        Args:
+            cipher: A `FeistelCipher`, `DomainCipher` or other permutation
+                with an optional `inverse` method.
+            size: Numbers in the domain, up to `2**32`.  Default is the
+                cipher's `n`, or `2**bits`, up to `2**24`; a larger table
+                takes gigabytes, so give its size explicitly.
+
+        Returns:
+            The table cipher.
+
+        Raises:
+            ValueError: When size is out of range, or not given for a
+                domain above 24 bits.
+        """
+        if size is None:
+            size = getattr(cipher, "n", None) or 1 << cipher.bits
+            if size > _DEFAULT_MAX_SIZE:
+                raise ValueError("give the size of a domain above 24 bits")
+        if not 0 < size <= 1 << 32:
+            raise ValueError("size must be within 1 and 2**32")
+        try:
+            import numpy as np
+        except ImportError:  # pragma: no cover - NumPy is optional
+            np = None
+        transform_array = getattr(cipher, "transform_array", None)
+        has_inverse = hasattr(cipher, "inverse")
+
+        forward = array.array(_TYPECODE)
+        backward = None
+        if np is not None and transform_array is not None:
+            values = transform_array(np.arange(size, dtype=np.uint32))
+            forward.frombytes(values.astype(np.uint32).tobytes())
+            if has_inverse:
+                inverse = np.empty(size, dtype=np.uint32)
+                inverse[values] = np.arange(size, dtype=np.uint32)
+                backward = array.array(_TYPECODE)
+                backward.frombytes(inverse.tobytes())
+        else:
+            forward.extend(map(cipher, range(size)))
+            if has_inverse:
+                backward = array.array(_TYPECODE, bytes(forward.itemsize * size))
+                for i, value in enumerate(forward):
+                    backward[value] = i
+        return cls(forward, backward)
+
+    def __len__(self) -> int:
+        """Return the number of entries in the domain."""
+        return len(self._forward)
+
+    def __call__(self, value: int) -> int:
+        """Return the transformed value.
+
+        Raises:
+            ValueError: When value outside the domain.
+        """
+        if value < 0:
+            raise ValueError("value is not within domain")
+        try:
+            return self._forward[value]
+        except IndexError:
+            raise ValueError("value is not within domain") from None
+
+    def inverse(self, value: int) -> int:
+        """Return the value before it was transformed.
+
+        Raises:
+            ValueError: When value outside the domain.
+        """
+        if value < 0:
+            raise ValueError("value is not within domain")
+        try:
+            return self._backward[value]
+        except IndexError:
+            raise ValueError("value is not within domain") from None
+
+    def save(self, path: str) -> None:
+        """Write the tables to a file for `load`.
+
+        The file is a small header followed by the little-endian uint32
+        forward table, then the inverse table when there is one.
+        """
+        has_inverse = self._backward is not self._forward
+        with open(path, "wb") as out:
+            out.write(_HEADER.pack(_MAGIC, len(self), _HAS_INVERSE * has_inverse))
+            tables = (
+                (self._forward, self._backward) if has_inverse else (self._forward,)
+            )
+            for table in tables:
+                if "big" == sys.byteorder:  # pragma: no cover
+                    table = array.array(_TYPECODE, table)
+                    table.byteswap()
+                out.write(memoryview(table).cast("B"))
+
+    @classmethod
+    def load(cls, path: str, use_mmap: bool = True) -> TableCipher:
+        """Read tables written by `save`.
+
+        Args:
+            path: The file from `save`.
+            use_mmap: Memory map the file read only, so processes loading
+                the same file share its pages.  Otherwise read a copy.
+
+        Returns:
+            The table cipher.
+
+        Raises:
+            ValueError: When the file was not written by `save`.
+        """
+        with open(path, "rb") as infile:
+            if use_mmap and "little" == sys.byteorder:
+                data: typing.Any = mmap.mmap(
+                    infile.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            else:
+                data = infile.read()
+        try:
+            magic, size, flags = _HEADER.unpack_from(data)
+        except struct.error:
+            magic = size = flags = None
+        count = 1 + bool(flags and flags & _HAS_INVERSE)
+        if magic != _MAGIC or len(data) != _HEADER.size + 4 * size * count:
+            if isinstance(data, mmap.mmap):
+                data.close()
+            raise ValueError(f"{path!r} is not a saved TableCipher")
+
+        tables: typing.List[Table] = []
+        for i in range(count):
+            start = _HEADER.size + 4 * size * i
+            if isinstance(data, mmap.mmap):
+                tables.append(memoryview(data)[start : start + 4 * size].cast("I"))
+            else:
+                table = array.array(_TYPECODE)
+                table.frombytes(data[start : start + 4 * size])
+                if "big" == sys.byteorder:  # pragma: no cover
+                    table.byteswap()
+                tables.append(table)
+        cipher = cls(*tables)
+        if isinstance(data, mmap.mmap):
+            cipher._mmap = data
+        return cipher
+
+    def close(self) -> None:
+        """Release a memory mapped file; the cipher is unusable afterwards."""
+        if self._mmap is not None:
+            for table in (self._forward, self._backward):
+                if isinstance(table, memoryview):
+                    table.release()
+            self._mmap.close()
+            self._mmap = None
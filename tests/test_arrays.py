@@ -0,0 +1,107 @@
+import pytest
+
+import tests.shared_data as data
+from obscure import FeistelCipher
+
+np = pytest.importorskip("numpy")
+arrays = pytest.importorskip("obscure.arrays")
+
+
+@pytest.mark.parametrize("domain_bits", (16, 32, 48, 64))
+@pytest.mark.parametrize("dtype", ("uint32", "uint64"))
+def test_transform_array_matches_scalar(domain_bits, dtype):
+    cipher = FeistelCipher(data.salt, data.prime, bits=domain_bits)
+    top = min((1 << domain_bits) - 1, np.iinfo(dtype).max)
+    values = np.array([top * i // 999 for i in range(1000)], dtype=dtype)
+    result = arrays.transform_array(values, data.salt, data.prime, domain_bits)
+    assert result is not values
+    assert [int(_) for _ in result] == [cipher(int(_)) for _ in values]
+
+
+def test_transform_array_known_values():
+    values = np.array(list(data.fx.keys()), dtype=np.uint32)
+    result = arrays.transform_array(values, data.salt, data.prime)
+    assert result.dtype == np.uint32
+    assert list(map(int, result)) == list(data.fx.values())
+
+
+def test_transform_array_out():
+    values = np.arange(100, dtype=np.uint64)
+    out = np.empty_like(values)
+    result = arrays.transform_array(values, data.salt, data.prime, 32, out=out)
+    assert result is out
+    # The transform is its own inverse
+    back = arrays.transform_array(out, data.salt, data.prime, 32)
+    assert (back == values).all()
+
+
+def test_transform_array_ex_not_in_domain():
+    with pytest.raises(ValueError) as ex:
+        arrays.transform_array(np.array([-1]), data.salt, data.prime)
+    assert "not within domain" in str(ex)
+    with pytest.raises(ValueError) as ex:
+        arrays.transform_array(np.array([1 << 16]), data.salt, data.prime, 16)
+    assert "not within domain" in str(ex)
+
+
+def test_transform_array_ex_bits_invalid():
+    with pytest.raises(ValueError):
+        arrays.transform_array(np.arange(3), data.salt, data.prime, 31)
+    with pytest.raises(ValueError):
+        arrays.transform_array(np.arange(3), data.salt, data.prime, 128)
+
+
+def test_transform_array_ex_dtype():
+    with pytest.raises(TypeError):
+        arrays.transform_array(np.ones(3), data.salt, data.prime)
+
+
+def test_transform_array_ex_out():
+    with pytest.raises(ValueError):
+        arrays.transform_array(np.arange(3), data.salt, data.prime, out=np.empty(4))
+    # Too narrow for the domain would truncate every result
+    narrow = np.empty(3, dtype=np.uint16)
+    with pytest.raises(ValueError):
+        arrays.transform_array(np.arange(3), data.salt, data.prime, out=narrow)
+    result = arrays.transform_array(np.arange(3), data.salt, data.prime, 16, out=narrow)
+    assert result is narrow
+
+
+@pytest.mark.parametrize("domain_bits", (16, 32, 64))
+@pytest.mark.parametrize("reuse", (False, True))
+def test_transform_range(domain_bits, reuse):
+    cipher = FeistelCipher(data.salt, data.prime, bits=domain_bits)
+    stop = 1 << domain_bits
+    start = stop - 1000
+    chunks = []
+    for chunk in arrays.transform_range(
+        start, stop, data.salt, data.prime, domain_bits, chunk=300, reuse=reuse
+    ):
+        chunks.append(chunk.tolist())
+    assert [300, 300, 300, 100] == [len(_) for _ in chunks]
+    assert sum(chunks, []) == [cipher(_) for _ in range(start, stop)]
+
+
+def test_transform_range_reuse_buffer():
+    chunks = list(
+        arrays.transform_range(0, 10, data.salt, data.prime, chunk=4, reuse=True)
+    )
+    assert chunks[0].base is chunks[1].base is not None
+    fresh = list(arrays.transform_range(0, 10, data.salt, data.prime, chunk=4))
+    assert fresh[0].base is not fresh[1].base
+
+
+def test_transform_range_empty():
+    assert [] == list(arrays.transform_range(5, 5, data.salt, data.prime))
+    assert [] == list(arrays.transform_range(5, 0, data.salt, data.prime))
+
+
+@pytest.mark.parametrize("start, stop", ((-1, 5), (0, (1 << 32) + 1)))
+def test_transform_range_ex_not_in_domain(start, stop):
+    with pytest.raises(ValueError):
+        arrays.transform_range(start, stop, data.salt, data.prime)
+
+
+def test_transform_range_ex_chunk():
+    with pytest.raises(ValueError):
+        arrays.transform_range(0, 5, data.salt, data.prime, chunk=0)
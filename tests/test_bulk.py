@@ -0,0 +1,70 @@
+import pytest
+
+import tests.shared_data as data
+from obscure import FeistelCipher, KeyedCipher
+
+np = pytest.importorskip("numpy")
+bulk = pytest.importorskip("obscure.bulk")
+
+
+@pytest.mark.parametrize("dtype", ("uint32", "uint64"))
+@pytest.mark.parametrize("domain_bits", (16, 32, 64))
+def test_transform_file_matches_cipher(tmp_path, dtype, domain_bits):
+    if domain_bits > 32 and dtype == "uint32":
+        pytest.skip("cipher wider than the file")
+    cipher = FeistelCipher(data.salt, data.prime, domain_bits)
+    values = np.arange(0, 1 << domain_bits, (1 << domain_bits) // 1000)
+    source, target = tmp_path / "ids.bin", tmp_path / "out.bin"
+    values.astype(bulk.dtypes[dtype]).tofile(source)
+    stats = bulk.transform_file(cipher, source, target, dtype, chunk=300)
+    assert stats.count == len(values)
+    assert stats.bytes == source.stat().st_size == target.stat().st_size
+    result = np.fromfile(target, dtype=bulk.dtypes[dtype]).tolist()
+    assert result == [cipher(int(_)) for _ in values]
+    assert "ids/s" in str(stats)
+
+
+def test_transform_file_in_place(tmp_path):
+    cipher = KeyedCipher("key", data.prime, bits=64)
+    path = tmp_path / "ids.bin"
+    values = np.arange(1000, dtype="<u8")
+    values.tofile(path)
+    bulk.transform_file(cipher, path, chunk=64)
+    assert np.fromfile(path, dtype="<u8").tolist() == list(map(cipher, range(1000)))
+    bulk.transform_file(cipher, path, inverse=True)
+    assert np.fromfile(path, dtype="<u8").tolist() == values.tolist()
+
+
+def test_transform_file_same_target(tmp_path):
+    cipher = FeistelCipher(data.salt, data.prime)
+    path = tmp_path / "ids.bin"
+    np.arange(5, dtype="<u4").tofile(path)
+    stats = bulk.transform_file(cipher, path, tmp_path / "." / "ids.bin")
+    assert 5 == stats.count
+    assert [cipher(_) for _ in range(5)] == np.fromfile(path, dtype="<u4").tolist()
+
+
+def test_transform_file_ex(tmp_path):
+    cipher = FeistelCipher(data.salt, data.prime, 16)
+    path = tmp_path / "ids.bin"
+    path.write_bytes(b"\x01\x00\x00")
+    with pytest.raises(ValueError):
+        bulk.transform_file(cipher, path)
+    np.array([1, 1 << 16], dtype="<u4").tofile(path)
+    with pytest.raises(ValueError):
+        bulk.transform_file(cipher, path)
+    assert [1, 1 << 16] == np.fromfile(path, dtype="<u4").tolist()
+    with pytest.raises(ValueError):
+        bulk.transform_file(FeistelCipher(bits=64), path, dtype="uint32")
+    with pytest.raises(ValueError):
+        bulk.transform_file(cipher, path, dtype="int32")
+    with pytest.raises(ValueError):
+        bulk.transform_file(cipher, path, chunk=0)
+
+
+def test_transform_file_empty(tmp_path):
+    source = tmp_path / "ids.bin"
+    source.write_bytes(b"")
+    stats = bulk.transform_file(FeistelCipher(), source, tmp_path / "out.bin")
+    assert 0 == stats.count
+    assert b"" == (tmp_path / "out.bin").read_bytes()
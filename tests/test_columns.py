@@ -0,0 +1,143 @@
+import sys
+
+import pytest
+
+import tests.shared_data as data
+from obscure import Encoder, FeistelCipher, KeyedCipher, WideCipher, columns
+from obscure.columns import decode_column, encode_column, transform_column
+
+pytest.importorskip("numpy")
+
+CIPHER = FeistelCipher(data.salt, data.prime)
+NUMBERS = [0, 101038, 0xFFFFFFFF]
+
+
+def test_transform_series():
+    pd = pytest.importorskip("pandas")
+    ids = pd.Series(NUMBERS, index=[5, 6, 7], name="id")
+    result = transform_column(ids, CIPHER)
+    assert [data.fx[_] for _ in NUMBERS] == result.tolist()
+    assert ids.index.equals(result.index) and "id" == result.name
+    assert NUMBERS == transform_column(result, CIPHER, inverse=True).tolist()
+
+
+def test_transform_series_nulls():
+    pd = pytest.importorskip("pandas")
+    ids = pd.Series([0, None, 101038], dtype="Int64")
+    result = transform_column(ids, CIPHER)
+    assert [data.fx[0], pd.NA, data.fx[101038]] == result.tolist()
+    assert [0, pd.NA, 101038] == transform_column(result, CIPHER).tolist()
+
+
+def test_columns_wide_cipher_nulls():
+    pd = pytest.importorskip("pandas")
+    pa = pytest.importorskip("pyarrow")
+    cipher = WideCipher("key")
+    encoder = Encoder(cipher, "hex")
+    ids = pd.Series([1, None, 1 << 100], dtype=object)
+    result = transform_column(ids, cipher)
+    assert [cipher(1), pd.NA, cipher(1 << 100)] == result.tolist()
+    tokens = encode_column(ids, encoder)
+    assert [1, pd.NA, 1 << 100] == decode_column(tokens, encoder).tolist()
+    tokens = encode_column(pa.array([1, None], type=pa.uint64()), encoder)
+    assert [1, None] == decode_column(tokens, encoder).to_pylist()
+
+
+@pytest.mark.parametrize("encoding", ("hex", "base32", "base64", "num"))
+def test_encode_series(encoding):
+    pd = pytest.importorskip("pandas")
+    encoder = Encoder(KeyedCipher("key", data.prime), encoding)
+    ids = pd.Series([*NUMBERS, None], dtype="UInt32", name="id")
+    tokens = encode_column(ids, encoder)
+    assert [encoder.encode(_) for _ in NUMBERS] == tokens.tolist()[:3]
+    assert tokens.isna().tolist() == [False, False, False, True]
+    if encoding != "num":
+        assert "string" == tokens.dtype
+        assert ids.tolist() == decode_column(tokens, encoder).tolist()
+
+
+def test_encode_arrow():
+    pa = pytest.importorskip("pyarrow")
+    encoder = Encoder(CIPHER, "base32")
+    ids = pa.array([*NUMBERS, None], type=pa.uint32())
+    tokens = encode_column(ids, encoder)
+    assert pa.string() == tokens.type
+    assert [*map(encoder.encode, NUMBERS), None] == tokens.to_pylist()
+    assert ids.to_pylist() == decode_column(tokens, encoder).to_pylist()
+    result = transform_column(ids, CIPHER)
+    assert [*(data.fx[_] for _ in NUMBERS), None] == result.to_pylist()
+
+
+@pytest.mark.parametrize("fixed", (False, True))
+@pytest.mark.parametrize("encoding", ("hex", "base32", "base64", "num"))
+@pytest.mark.parametrize("domain_bits", (16, 64))
+def test_encode_arrow_matches_encoder(domain_bits, encoding, fixed):
+    pa = pytest.importorskip("pyarrow")
+    cipher = KeyedCipher("key", data.prime, domain_bits)
+    encoder = Encoder(cipher, encoding, domain_bits if fixed else 0)
+    step = (1 << domain_bits) // 997
+    numbers = [0, 1, (1 << domain_bits) - 1, *range(0, 1 << domain_bits, step)]
+    tokens = encode_column(pa.array(numbers, type=pa.uint64()), encoder)
+    assert [encoder.encode(_) for _ in numbers] == tokens.to_pylist()
+
+
+def test_encode_arrow_chunked():
+    pa = pytest.importorskip("pyarrow")
+    encoder = Encoder(CIPHER, "hex")
+    ids = pa.chunked_array([[0, 1], [2]], type=pa.int64())
+    tokens = encode_column(ids, encoder)
+    assert 2 == tokens.num_chunks
+    assert [encoder.encode(_) for _ in range(3)] == tokens.to_pylist()
+    assert [0, 1, 2] == decode_column(tokens, encoder).to_pylist()
+    result = transform_column(ids, CIPHER)
+    assert 2 == result.num_chunks
+    assert [CIPHER(_) for _ in range(3)] == result.to_pylist()
+
+
+def test_encode_arrow_large_string(monkeypatch):
+    pa = pytest.importorskip("pyarrow")
+    monkeypatch.setattr(columns, "_STRING_LIMIT", 8)
+    encoder = Encoder(CIPHER, "hex")
+    tokens = encode_column(pa.array(NUMBERS, type=pa.uint32()), encoder)
+    assert pa.large_string() == tokens.type
+    assert [encoder.encode(_) for _ in NUMBERS] == tokens.to_pylist()
+
+
+def test_encode_series_without_pyarrow(monkeypatch):
+    pd = pytest.importorskip("pandas")
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    encoder = Encoder(CIPHER, "hex")
+    tokens = encode_column(pd.Series([*NUMBERS, None], dtype="UInt32"), encoder)
+    assert [*map(encoder.encode, NUMBERS), None] == [
+        None if pd.isna(_) else _ for _ in tokens.tolist()
+    ]
+
+
+def test_columns_wide_cipher():
+    pd = pytest.importorskip("pandas")
+    encoder = Encoder(WideCipher("key"), "base32")
+    ids = pd.Series([0, 1 << 100], dtype=object)
+    tokens = encode_column(ids, encoder)
+    assert [encoder.encode(0), encoder.encode(1 << 100)] == tokens.tolist()
+    assert [0, 1 << 100] == decode_column(tokens, encoder).tolist()
+    encoder = Encoder(WideCipher("key"), "base32", 128)
+    tokens = encode_column(ids, encoder)
+    assert [encoder.encode(0), encoder.encode(1 << 100)] == tokens.tolist()
+
+
+def test_columns_ex():
+    pd = pytest.importorskip("pandas")
+    with pytest.raises(TypeError):
+        transform_column([1, 2], CIPHER)
+    with pytest.raises(ValueError):
+        transform_column(pd.Series([-1]), CIPHER)
+    with pytest.raises(ValueError):
+        decode_column(pd.Series(["~"]), Encoder(CIPHER, "hex"))
+    with pytest.raises(ValueError, match="'1ffffffffffffffff'"):
+        decode_column(pd.Series(["0", "1ffffffffffffffff"]), Encoder(CIPHER, "hex"))
+    with pytest.raises(ValueError, match="'100000000'"):
+        decode_column(pd.Series(["100000000"]), Encoder(CIPHER, "hex"))
+    assert (
+        []
+        == encode_column(pd.Series([], dtype="uint32"), Encoder(CIPHER, "hex")).tolist()
+    )
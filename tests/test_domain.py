@@ -0,0 +1,92 @@
+import pickle
+
+import pytest
+
+import tests.shared_data as data
+from obscure import DomainCipher, Encoder
+
+
+@pytest.mark.parametrize("n", (1, 2, 3, 5, 17, 1000, 1025, 4096))
+def test_domain_cipher_permutation(n):
+    cipher = DomainCipher(n, data.salt, data.prime)
+    transformed = [cipher(_) for _ in range(n)]
+    assert sorted(transformed) == list(range(n))
+    assert list(range(n)) == [cipher.inverse(_) for _ in transformed]
+    np = pytest.importorskip("numpy")
+    assert transformed == cipher.transform_array(np.arange(n)).tolist()
+    assert list(range(n)) == cipher.inverse_array(transformed).tolist()
+
+
+def test_domain_cipher_not_an_involution():
+    cipher = DomainCipher(1000, data.salt, data.prime)
+    moved = [_ for _ in range(1000) if cipher(_) != _]
+    assert len(moved) > 990
+    assert any(cipher(cipher(_)) != _ for _ in range(1000))
+
+
+def test_domain_cipher_walk_bound():
+    """Every enclosing number is visited at most once: steps <= M."""
+    n = 10_000
+    cipher = DomainCipher(n, data.salt, data.prime)
+    steps = 0
+    for i in range(n):
+        value = cipher.cipher(i ^ cipher._top)
+        steps += 1
+        while value >= n:
+            value = cipher.cipher(value ^ cipher._top)
+            steps += 1
+    assert steps <= 1 << cipher.bits
+    assert 14 == cipher.bits
+
+
+def test_domain_cipher_encoder():
+    encoder = Encoder(DomainCipher(10_000_000, data.salt, data.prime), "base32")
+    numbers = [0, 1, 101038, 9_999_999]
+    texts = [encoder.encode(_) for _ in numbers]
+    assert numbers == [encoder.decode(_) for _ in texts]
+    assert numbers == list(encoder.decode_many(encoder.encode_many(numbers)))
+    copy = pickle.loads(pickle.dumps(encoder))
+    assert texts == list(copy.encode_many(numbers))
+
+
+def test_domain_cipher_pickle_repr():
+    cipher = DomainCipher(12345, data.salt, data.prime, 5)
+    copies = (pickle.loads(pickle.dumps(cipher)), eval(repr(cipher)))
+    for copy in copies:
+        assert [copy(_) for _ in range(100)] == [cipher(_) for _ in range(100)]
+
+
+def test_domain_cipher_array():
+    np = pytest.importorskip("numpy")
+    n = 100_000
+    cipher = DomainCipher(n, data.salt, data.prime)
+    values = np.arange(n, dtype=np.int64)
+    result = cipher.transform_array(values)
+    assert [cipher(_) for _ in range(0, n, 97)] == result[::97].tolist()
+    out = np.empty(n, dtype=np.uint64)
+    assert cipher.inverse_array(result, out=out) is out
+    assert (out == values).all()
+
+
+@pytest.mark.parametrize("value", (-1, 10))
+def test_domain_cipher_ex_not_in_domain(value):
+    cipher = DomainCipher(10, data.salt, data.prime)
+    with pytest.raises(ValueError):
+        cipher(value)
+    with pytest.raises(ValueError):
+        cipher.inverse(value)
+
+
+def test_domain_cipher_ex_array():
+    np = pytest.importorskip("numpy")
+    cipher = DomainCipher(10, data.salt, data.prime)
+    with pytest.raises(ValueError):
+        cipher.transform_array(np.arange(11))
+    with pytest.raises(TypeError):
+        cipher.transform_array(np.ones(3))
+
+
+@pytest.mark.parametrize("n", (0, -1, 1.5))
+def test_domain_cipher_ex_n(n):
+    with pytest.raises(ValueError):
+        DomainCipher(n)
@@ -1,3 +1,6 @@
+import base64
+import random
+
 import pytest
 
 import obscure.encoder as change
@@ -22,6 +25,26 @@ def test_base32_round_trip():
         assert set(b32_str).issubset(alphabet)
 
 
+def _rfc4648_crockford(number: int) -> str:
+    """Base32 encoding through the base64 module."""
+    rfc = base64.b32encode(
+        number.to_bytes(max(1, (number.bit_length() + 7) // 8), "big")
+    )
+    crockford = bytes.maketrans(base64._b32alphabet, change._b32_crockford)
+    return rfc.translate(crockford).decode("utf-8").rstrip("=")
+
+
+def test_base32_matches_rfc4648():
+    """The table driven codec is identical to base64.b32encode."""
+    rand = random.Random(101038)
+    numbers = [(1 << b) - 1 for b in range(300)] + [1 << b for b in range(300)]
+    numbers.extend(rand.getrandbits(rand.randint(1, 256)) for _ in range(2000))
+    for i in numbers:
+        b32_str = change.base32_encode(i)
+        assert b32_str == _rfc4648_crockford(i)
+        assert i == change.base32_decode(b32_str)
+
+
 def test_base32_0():
     """Make sure we see '00' the Crockford alphabet. 'AA' is RFC 4648."""
     assert "00" == change.base32_encode(0)
@@ -46,9 +69,53 @@ def test_encode_base32_ex_bad_input():
         change.base32_encode(-1)
 
 
-def test_decode_base32_ex():
+@pytest.mark.parametrize(
+    "text", ("AEIOU-1", "0", "000", "00=", "0o", "+0", " 00", "٣0")
+)
+def test_decode_base32_ex(text):
     with pytest.raises(ValueError):
-        change.base32_decode("AEIOU-1")
+        change.base32_decode(text)
+
+
+@pytest.mark.parametrize(
+    "text", ("AEIOU-1", "0", "000", "00=", "0o", "+0", " 00", "٣0")
+)
+def test_try_base32_decode_invalid(text):
+    assert change.try_base32_decode(text) is None
+
+
+@pytest.mark.parametrize("encoding", sorted(change.encodings))
+def test_try_decoders_round_trip(encoding):
+    encode, decode = change.encodings[encoding]
+    try_decode = change.try_decoders[encoding]
+    for i in (0, 1, 255, 256, 101038, (1 << 64) - 1):
+        assert i == try_decode(str(encode(i)))
+
+
+@pytest.mark.parametrize(
+    "encoding, text",
+    (
+        ("num", ""),
+        ("num", "-1"),
+        ("num", " 12"),
+        ("num", "1_2"),
+        ("num", "٣"),
+        ("hex", ""),
+        ("hex", "0x1f"),
+        ("hex", "1g"),
+        ("hex", "+1"),
+        ("base64", "A"),
+        ("base64", "AY+u"),
+        ("base64", "AYqu=="),
+        ("base64", "AY qu"),
+    ),
+)
+def test_try_decoders_invalid(encoding, text):
+    assert change.try_decoders[encoding](text) is None
+
+
+def test_try_base32_decode_empty():
+    assert 0 == change.try_base32_decode("")
 
 
 def test_encode_base64_ex_bad_input():
@@ -59,3 +126,47 @@ def test_encode_base64_ex_bad_input():
 def test_decode_base64_ex():
     with pytest.raises(ValueError):
         change.base64_decode("0==")
+
+
+@pytest.mark.parametrize("bits", (16, 32, 64, 128))
+@pytest.mark.parametrize("encoding", sorted(change.encodings))
+def test_fixed_encodings(bits, encoding):
+    encode, decode = change.fixed_encodings(bits)[encoding]
+    numbers = [0, 1, 0xFF, (1 << (bits // 2)) + 1, (1 << bits) - 2, (1 << bits) - 1]
+    texts = [encode(_) for _ in numbers]
+    assert len(set(map(len, texts))) == 1
+    assert numbers == [decode(_) for _ in texts]
+    if "base64" != encoding:
+        assert texts == sorted(texts)
+
+
+@pytest.mark.parametrize("bits", (0, 16, 64))
+@pytest.mark.parametrize("encoding", sorted(change.encodings))
+def test_bytes_encodings_match_str(bits, encoding):
+    table = change.fixed_encodings(bits) if bits else change.encodings
+    bytes_table = change.fixed_encodings(bits, True) if bits else change.bytes_encodings
+    encode, _ = table[encoding]
+    encode_bytes, decode_bytes = bytes_table[encoding]
+    for i in (0, 1, 0xFF, 0x100, 101038, 0xFFFF, random.getrandbits(max(1, bits))):
+        data = encode_bytes(i)
+        assert str(encode(i)).encode("ascii") == data
+        assert i == decode_bytes(data)
+        assert i == decode_bytes(bytearray(data))
+
+
+@pytest.mark.parametrize("data", (b"AEIOU-1", b"0", b"000", b"00=", b"0o", b" 00"))
+def test_decode_base32_bytes_ex(data):
+    with pytest.raises(ValueError):
+        change.base32_decode_bytes(data)
+
+
+def test_decode_base32_bytes_empty():
+    assert 0 == change.base32_decode_bytes(b"")
+
+
+def test_encode_bytes_ex_bad_input():
+    for encode in (change.base32_encode_bytes, change.base64_encode_bytes):
+        with pytest.raises(ValueError):
+            encode(-1)
+    with pytest.raises(ValueError):
+        change.base64_decode_bytes(b"0==")
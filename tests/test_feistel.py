@@ -4,7 +4,15 @@ import pytest
 
 import obscure
 import tests.shared_data as data
-from obscure.feistel import Encoder, FeistelCipher
+from obscure import DomainCipher, TableCipher
+from obscure.encoder import encodings
+from obscure.feistel import (
+    Encoder,
+    FeistelCipher,
+    FeistelFx,
+    _compile_feistel_cipher,
+    create_feistel_cipher,
+)
 
 
 def test_feistel_domain_boundary(feistel32):
@@ -18,6 +26,31 @@ def test_feistel_make_fx():
     assert all(data.fx[x] == f(x) for x in (0, 101038, 0xFFFFFFFF))
 
 
+@pytest.mark.parametrize("rounds", (0, 1, 4, 5))
+@pytest.mark.parametrize("domain_bits", (2, 32, 64, 128))
+def test_feistel_compiled_matches_closure(domain_bits, rounds):
+    from obscure.feistel import (
+        _compile_feistel_cipher,
+        _feistel_closure,
+        create_feistel_cipher,
+    )
+
+    fx = FeistelFx(data.salt, data.prime)
+    default = create_feistel_cipher(fx, domain_bits, rounds)
+    compiled = _compile_feistel_cipher(data.salt, data.prime, domain_bits, rounds)
+    general = _feistel_closure(fx, domain_bits, rounds)
+    mask = (1 << domain_bits) - 1
+    for i in range(0, mask, max(1, mask // 500)):
+        assert default(i) == compiled(i) == general(i)
+
+
+def test_feistel_custom_fx_not_compiled():
+    from obscure.feistel import create_feistel_cipher
+
+    cipher = create_feistel_cipher(lambda x: x * 7, 16, 4)
+    assert 0 <= cipher(1234) <= 0xFFFF
+
+
 def test_feistel_random_salt_prime():
     f = FeistelCipher(None, None)
     assert all(0 <= f(x) for x in (0, 101038))
@@ -40,6 +73,161 @@ def test_encoder():
     assert 101038 == encoder.decode(encoder.encode(101038))
 
 
+@pytest.mark.parametrize("encoding", sorted(obscure.encodings))
+def test_encoder_many(encoding):
+    encoder = Encoder(FeistelCipher(data.salt, data.prime), encoding)
+    numbers = range(0, 0xFFFFFFFF, 0xFFFFFF)
+    encoded = encoder.encode_many(iter(numbers))
+    assert isinstance(encoded, typing.Iterator)
+    encoded = list(encoded)
+    assert encoded == [encoder.encode(_) for _ in numbers]
+    assert list(numbers) == list(encoder.decode_many(_ for _ in encoded))
+
+
+def test_encoder_fixed_bits():
+    encoder = Encoder(FeistelCipher(data.salt, data.prime, 64), "base32", 64)
+    texts = [encoder.encode(_) for _ in range(100)]
+    assert {13} == set(map(len, texts))
+    assert list(range(100)) == [encoder.decode(_) for _ in texts]
+    with pytest.raises(ValueError):
+        Encoder(FeistelCipher(bits=64), "hex", 32)
+    with pytest.raises(ValueError):
+        Encoder(DomainCipher(1000), "hex", 8)
+    assert {3} == {
+        len(Encoder(DomainCipher(1000), "hex", 10).encode(_)) for _ in (0, 999)
+    }
+
+
+@pytest.mark.parametrize("encoding", ("num", "hex", "base32", "base64"))
+@pytest.mark.parametrize("fixed_bits", (0, 32))
+def test_encoder_try_decode(encoding, fixed_bits):
+    encoder = Encoder(FeistelCipher(data.salt, data.prime), encoding, fixed_bits)
+    for i in (0, 1, 101038, (1 << 32) - 1):
+        text = str(encoder.encode(i))
+        assert encoder.is_valid(text)
+        assert i == encoder.try_decode(text)
+    too_big = str(encodings[encoding][0](1 << 32))
+    for junk in ("", "!", "0" * 100, too_big, "~" + text[1:]):
+        assert not encoder.is_valid(junk)
+        assert encoder.try_decode(junk) is None
+
+
+def test_encoder_try_decode_no_cipher_work():
+    calls = []
+
+    def cipher(value):
+        calls.append(value)
+        return value
+
+    encoder = Encoder(cipher, "base32")
+    assert 7 == encoder.try_decode(encoder.encode(7))
+    assert encoder.is_valid(encoder.encode(8))
+    assert encoder.try_decode("ILOU") is None
+    assert [7, 7, 8] == calls
+
+
+@pytest.mark.parametrize(
+    "cipher",
+    (
+        create_feistel_cipher(FeistelFx(data.salt, data.prime), 32, 4),
+        create_feistel_cipher(lambda value: value * 7, 32, 4),
+        _compile_feistel_cipher(data.salt, data.prime, 32, 4),
+    ),
+)
+def test_encoder_try_decode_function(cipher):
+    """Functions from the factories know their domain."""
+    encoder = Encoder(cipher, "hex")
+    assert 101038 == encoder.try_decode(encoder.encode(101038))
+    assert not encoder.is_valid("ffffffffff")
+    assert encoder.try_decode("ffffffffff") is None
+
+
+def test_encoder_try_decode_unknown_domain():
+    """A cipher function raising for an unknown domain gives None."""
+
+    def cipher(value):
+        if value > 100:
+            raise ValueError("value is not within domain")
+        return value
+
+    encoder = Encoder(cipher, "hex")
+    assert 5 == encoder.try_decode("5")
+    assert encoder.try_decode("ffff") is None
+
+
+def test_encoder_try_decode_domain():
+    domain = DomainCipher(1000, data.salt, data.prime)
+    encoder = Encoder(domain, "hex")
+    assert 999 == encoder.try_decode(encoder.encode(999))
+    assert encoder.try_decode("3e8") is None
+    assert encoder.try_decode("fff") is None
+    table = Encoder(TableCipher.build(domain), "hex")
+    assert 999 == table.try_decode(table.encode(999))
+    assert table.try_decode("3e8") is None
+
+
+@pytest.mark.parametrize("fixed_bits", (0, 32))
+def test_encoder_bytes(fixed_bits):
+    encoder = Encoder(FeistelCipher(data.salt, data.prime), "base32", fixed_bits)
+    data_ = encoder.encode_bytes(101038)
+    assert encoder.encode(101038).encode("ascii") == data_
+    assert 101038 == encoder.decode_bytes(data_)
+
+
+def test_encoder_encode_into():
+    encoder = Encoder(FeistelCipher(data.salt, data.prime), "hex", 32)
+    buffer = bytearray(b"id=" + b" " * 8 + b";")
+    assert 11 == encoder.encode_into(5, buffer, 3)
+    assert b"id=" + encoder.encode_bytes(5) + b";" == buffer
+    view = memoryview(bytearray(16))
+    assert 16 == encoder.encode_into(6, view, encoder.encode_into(5, view))
+    assert encoder.encode_bytes(5) + encoder.encode_bytes(6) == view.tobytes()
+    for offset in (-1, 9):
+        with pytest.raises(ValueError):
+            encoder.encode_into(5, view, offset)
+
+
+@pytest.mark.parametrize("domain_bits", (16, 32, 64, 128))
+def test_feistel_transform_range(domain_bits):
+    cipher = FeistelCipher(data.salt, data.prime, bits=domain_bits)
+    stop = 1 << domain_bits
+    chunks = list(cipher.transform_range(stop - 250, stop, chunk=100))
+    assert [100, 100, 50] == [len(_) for _ in chunks]
+    assert sum(chunks, []) == [cipher(_) for _ in range(stop - 250, stop)]
+    with pytest.raises(ValueError):
+        cipher.transform_range(stop - 1, stop + 1)
+    with pytest.raises(ValueError):
+        cipher.transform_range(-1, 1)
+    with pytest.raises(ValueError):
+        cipher.transform_range(0, 1, chunk=0)
+
+
+def test_feistel_transform_range_array():
+    pytest.importorskip("numpy")
+    cipher = FeistelCipher(data.salt, data.prime)
+    arrays = cipher.transform_range(0, 250, chunk=100, as_array=True)
+    assert [_.tolist() for _ in arrays] == list(cipher.transform_range(0, 250, 100))
+
+
+@pytest.mark.parametrize("encoding", ("num", "base32"))
+def test_encoder_encode_range(encoding):
+    encoder = Encoder(FeistelCipher(data.salt, data.prime), encoding)
+    chunks = list(encoder.encode_range(10, 260, chunk=100))
+    assert [100, 100, 50] == [len(_) for _ in chunks]
+    assert sum(chunks, []) == [encoder.encode(_) for _ in range(10, 260)]
+    with pytest.raises(ValueError):
+        encoder.encode_range(0, (1 << 32) + 1)
+
+
+def test_encoder_encode_range_any_cipher():
+    encoder = Encoder(DomainCipher(1000, data.salt, data.prime), "hex")
+    assert sum(encoder.encode_range(0, 1000, 64), []) == [
+        encoder.encode(_) for _ in range(1000)
+    ]
+    encoder = Encoder(lambda x: x ^ 1, "hex")
+    assert [["1", "0", "3"]] == list(encoder.encode_range(0, 3))
+
+
 def test_encoder_ex_parameter_feistel():
     with pytest.raises(ValueError) as ex:
         Encoder(typing.cast(None, 123), "num")
@@ -111,3 +299,144 @@ def is_uniform_distribution(sequence: typing.Sequence[int], domain: int):
 
     critical_value = 14.067140449340169
     return chi_squared_statistic <= critical_value
+
+
+def test_cached_encoder():
+    encoder = obscure.CachedEncoder(FeistelCipher(data.salt, data.prime), "base32", 4)
+    plain = Encoder(FeistelCipher(data.salt, data.prime), "base32")
+    numbers = [1, 2, 1, 3, 4, 5, 1]
+    assert list(encoder.encode_many(numbers)) == list(plain.encode_many(numbers))
+    info = encoder.cache_info()["encode"]
+    assert (info.hits, info.misses, info.evictions, info.currsize) == (2, 5, 1, 4)
+
+    texts = list(plain.encode_many(numbers))
+    assert list(encoder.decode_many(texts)) == numbers
+    assert 2 == encoder.cache_info()["decode"].hits
+
+    encoder.cache_clear()
+    assert (0, 0, 0, 0, 4) == encoder.cache_info()["encode"]
+
+
+def test_cached_encoder_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    encoder = obscure.CachedEncoder(FeistelCipher(data.salt, data.prime), "hex", 64)
+    numbers = [i % 100 for i in range(5000)]
+    with ThreadPoolExecutor(8) as pool:
+        texts = list(pool.map(encoder.encode, numbers))
+        assert numbers == list(pool.map(encoder.decode, texts))
+    info = encoder.cache_info()["encode"]
+    assert info.hits + info.misses == len(numbers)
+    assert info.currsize == 64
+    # Threads racing on the same miss each count it, but insert it once.
+    assert info.misses - info.evictions >= info.currsize
+
+
+def test_cached_encoder_ex_invalid():
+    encoder = obscure.CachedEncoder(None, "base32")
+    with pytest.raises(ValueError):
+        encoder.decode("ILOU")
+    assert 0 == encoder.cache_info()["decode"].currsize
+    with pytest.raises(ValueError):
+        obscure.CachedEncoder(None, "base32", 0)
+
+
+def test_cached_encoder_pickle():
+    import pickle
+
+    encoder = obscure.CachedEncoder(FeistelCipher(data.salt, data.prime), "hex", 8)
+    text = encoder.encode(101038)
+    copy = pickle.loads(pickle.dumps(encoder))
+    assert copy.cipher == encoder.cipher
+    assert 0 == copy.cache_info()["encode"].currsize
+    assert 8 == copy.cache_info()["decode"].maxsize
+    assert text == copy.encode(101038)
+    assert 101038 == copy.decode(text)
+    assert 1 == encoder.cache_info()["encode"].currsize
+
+
+@pytest.mark.parametrize(
+    "salt, prime, domain_bits", ((data.salt, data.prime, 32), (-1, 1 << 70, 128))
+)
+def test_feistel_cipher_serialize(salt, prime, domain_bits):
+    import pickle
+
+    cipher = FeistelCipher(salt, prime, domain_bits, 5)
+    assert (salt, prime, domain_bits, 5) == (
+        cipher.salt,
+        cipher.prime,
+        cipher.bits,
+        cipher.rounds,
+    )
+    copies = (
+        pickle.loads(pickle.dumps(cipher)),
+        FeistelCipher.from_bytes(cipher.to_bytes()),
+        FeistelCipher.from_dict(cipher.to_dict()),
+        eval(repr(cipher), {"FeistelCipher": FeistelCipher}),
+    )
+    for copy in copies:
+        assert copy == cipher
+        assert hash(copy) == hash(cipher)
+        assert all(copy(_) == cipher(_) for _ in (0, 101038, 0xFFFFFFFF))
+    assert cipher != FeistelCipher(salt, prime, domain_bits, 4)
+    assert cipher != cipher.to_dict()
+
+
+def test_feistel_cipher_random_parameters_kept():
+    import pickle
+
+    cipher = FeistelCipher()
+    assert cipher.salt and cipher.prime
+    assert pickle.loads(pickle.dumps(cipher))(101038) == cipher(101038)
+
+
+@pytest.mark.parametrize("packed", (b"", b"\x00\x20\x00\x04\x01", b"\x00" * 9))
+def test_feistel_cipher_ex_from_bytes(packed):
+    with pytest.raises(ValueError):
+        FeistelCipher.from_bytes(packed)
+
+
+def test_feistel_cipher_transform_array():
+    np = pytest.importorskip("numpy")
+    cipher = FeistelCipher(data.salt, data.prime)
+    values = np.array(list(data.fx), dtype=np.uint32)
+    assert list(data.fx.values()) == cipher.transform_array(values).tolist()
+
+
+def test_encoder_pickle():
+    import pickle
+
+    encoder = Encoder(FeistelCipher(data.salt, data.prime), "base32")
+    copy = pickle.loads(pickle.dumps(encoder))
+    assert copy.cipher == encoder.cipher
+    assert encoder.encode(101038) == copy.encode(101038)
+
+
+@pytest.mark.parametrize("threshold", (1, 10_000))
+def test_encoder_async(threshold):
+    import asyncio
+
+    encoder = Encoder(FeistelCipher(data.salt, data.prime), "base64")
+    numbers = range(2000)
+
+    async def round_trip():
+        texts = await encoder.aencode_many(numbers, threshold=threshold)
+        return texts, await encoder.adecode_many(iter(texts), threshold=threshold)
+
+    texts, decoded = asyncio.run(round_trip())
+    assert texts == list(encoder.encode_many(numbers))
+    assert list(numbers) == decoded
+
+
+def test_encoder_async_process_pool():
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+    encoder = Encoder(FeistelCipher(data.salt, data.prime), "hex")
+
+    async def encode(pool):
+        return await encoder.aencode_many(range(100), executor=pool, threshold=10)
+
+    with ProcessPoolExecutor(1) as pool:
+        texts = asyncio.run(encode(pool))
+    assert texts == list(encoder.encode_many(range(100)))
@@ -0,0 +1,67 @@
+"""Import time budget.
+
+Short lived processes, such as `python -m obscure` or serverless
+workers, pay for every module imported.  `import obscure` imports
+nothing until a name is used, and using the `Encoder` does not import
+asyncio, concurrent.futures, hashlib or random.
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Generous budgets in seconds for a slow machine, well below the cost
+# of importing asyncio or concurrent.futures eagerly.
+IMPORT_BUDGET = 0.010
+ENCODER_BUDGET = 0.080
+DEFERRED = ("asyncio", "concurrent.futures", "hashlib", "random")
+
+_script = """
+import json, sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+{}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, sorted(set(sys.modules) - before)]))
+"""
+
+
+def run(statement):
+    """Return seconds to run statement and the modules it imported."""
+    output = subprocess.run(
+        [sys.executable, "-c", _script.format(statement)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def test_import_obscure_is_lazy():
+    _, modules = run("import obscure")
+    assert ["obscure"] == [_ for _ in modules if _.startswith("obscure")]
+    assert "typing" not in modules
+    elapsed = min(run("import obscure")[0] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET
+
+
+def test_import_encoder_defers_modules():
+    _, modules = run(
+        "from obscure import Encoder, FeistelCipher; Encoder(FeistelCipher(1, 3), 'base32').encode(5)"
+    )
+    assert not set(DEFERRED) & set(modules)
+    assert "obscure.parallel" not in modules
+    elapsed = min(run("from obscure import Encoder")[0] for _ in range(3))
+    assert elapsed < ENCODER_BUDGET
+
+
+def test_lazy_attributes():
+    import obscure
+
+    assert set(obscure.__all__) <= set(dir(obscure))
+    for name in obscure.__all__:
+        assert getattr(obscure, name) is not None
+    with pytest.raises(AttributeError):
+        obscure.missing  # noqa: B018
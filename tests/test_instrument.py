@@ -0,0 +1,146 @@
+import pytest
+
+import tests.shared_data as data
+from obscure import CachedEncoder, Encoder, FeistelCipher
+from obscure.feistel import create_feistel_cipher
+from obscure.instrument import (
+    CallbackRecorder,
+    Metrics,
+    PrometheusRecorder,
+    StatsdRecorder,
+    instrument,
+    timed,
+)
+
+
+@pytest.fixture
+def encoder():
+    return Encoder(FeistelCipher(data.salt, data.prime), "base32")
+
+
+def test_instrument_leaves_original_untouched(encoder):
+    func, coder = encoder.func, encoder.encoder
+    instrumented = instrument(encoder, Metrics())
+    assert encoder.func is func and encoder.encoder is coder
+    assert instrumented.func is not func
+    assert instrumented.encode(101038) == encoder.encode(101038)
+
+
+def test_metrics_counts_and_errors(encoder):
+    metrics = Metrics()
+    instrumented = instrument(encoder, metrics)
+    texts = list(instrumented.encode_many(range(10)))
+    assert list(instrumented.decode_many(texts)) == list(range(10))
+    for bad in ("ILOU", "A"):
+        with pytest.raises(ValueError):
+            instrumented.decode(bad)
+    stats = metrics.snapshot()
+    assert {"transform", "encode", "decode", "inverse"} == set(stats)
+    assert (10, 0) == (stats["transform"]["count"], stats["transform"]["errors"])
+    assert (12, 2) == (stats["decode"]["count"], stats["decode"]["errors"])
+    assert 10 == sum(stats["inverse"]["histogram"].values())
+    assert stats["encode"]["seconds"] > 0
+    metrics.reset()
+    assert {} == metrics.snapshot()
+
+
+def test_metrics_histogram_buckets():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 2.0):
+        metrics.observe("op", seconds)
+    assert {0.1: 2, 1.0: 1} == metrics.snapshot()["op"]["histogram"]
+    assert 4 == metrics.snapshot()["op"]["count"]
+
+
+def test_instrument_cached_encoder():
+    metrics = Metrics()
+    encoder = instrument(
+        CachedEncoder(FeistelCipher(data.salt, data.prime), "hex"), metrics
+    )
+    for _ in range(3):
+        encoder.encode(5)
+    assert 1 == metrics.snapshot()["transform"]["count"]
+
+
+def test_callback_recorder(encoder):
+    seen, errors = [], []
+    recorder = CallbackRecorder(
+        lambda op, seconds: seen.append(op), lambda op, ex: errors.append(op)
+    )
+    instrumented = instrument(encoder, recorder)
+    instrumented.decode(instrumented.encode(7))
+    with pytest.raises(ValueError):
+        instrumented.decode("!")
+    assert ["transform", "encode", "decode", "inverse"] == seen
+    assert ["decode"] == errors
+    # Reporting errors is optional
+    instrumented = instrument(encoder, CallbackRecorder(lambda op, seconds: None))
+    with pytest.raises(ValueError):
+        instrumented.decode("!")
+
+
+def test_timed_cipher():
+    metrics = Metrics()
+    cipher = FeistelCipher(data.salt, data.prime, bits=16)
+    func = timed("cipher", cipher, metrics)
+    assert func(101) == cipher(101)
+    with pytest.raises(ValueError):
+        func(1 << 16)
+    assert (2, 1) == tuple(metrics.snapshot()["cipher"][_] for _ in ("count", "errors"))
+
+
+class FakeStatsd:
+    def __init__(self):
+        self.calls = []
+
+    def timing(self, name, ms):
+        self.calls.append(("timing", name))
+
+    def incr(self, name):
+        self.calls.append(("incr", name))
+
+
+class FakeMetric:
+    def __init__(self):
+        self.calls = []
+
+    def labels(self, operation):
+        self.calls.append(operation)
+        return self
+
+    def observe(self, seconds):
+        pass
+
+    def inc(self):
+        pass
+
+
+def test_statsd_recorder(encoder):
+    client = FakeStatsd()
+    instrumented = instrument(encoder, StatsdRecorder(client, "ids"))
+    instrumented.encode(3)
+    with pytest.raises(ValueError):
+        instrumented.decode("U")
+    assert ("timing", "ids.transform") == client.calls[0]
+    assert ("incr", "ids.decode.errors") == client.calls[-1]
+
+
+def test_prometheus_recorder(encoder):
+    histogram, errors = FakeMetric(), FakeMetric()
+    instrumented = instrument(encoder, PrometheusRecorder(histogram, errors))
+    instrumented.encode(3)
+    with pytest.raises(ValueError):
+        instrumented.decode("U")
+    assert ["transform", "encode"] == histogram.calls
+    assert ["decode"] == errors.calls
+
+
+def test_instrument_skips_batch():
+    """encode_range goes through the recorded transform, not the batch."""
+    cipher = create_feistel_cipher(lambda value: value * 7 & 0xFFFF, 32, 4)
+    assert hasattr(cipher, "batch")
+    metrics = Metrics()
+    encoder = instrument(Encoder(cipher, "hex"), metrics)
+    assert not hasattr(encoder.func, "batch")
+    assert 10 == sum(map(len, encoder.encode_range(0, 10)))
+    assert 10 == metrics.snapshot()["transform"]["count"]
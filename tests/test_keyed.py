@@ -0,0 +1,97 @@
+import pickle
+
+import pytest
+
+import tests.shared_data as data
+from obscure import Encoder, KeyedCipher
+from obscure.feistel import _compile_feistel_cipher, key_schedule
+
+
+@pytest.mark.parametrize("rounds", (0, 1, 4, 7))
+@pytest.mark.parametrize("domain_bits", (16, 32, 64, 128))
+def test_keyed_cipher_inverse(domain_bits, rounds):
+    cipher = KeyedCipher(b"secret", 1 << 61 | 1, domain_bits, rounds)
+    mask = (1 << domain_bits) - 1
+    for i in range(0, mask, max(1, mask // 500)):
+        assert i == cipher.inverse(cipher(i))
+        assert i == cipher(cipher.inverse(i))
+
+
+def test_keyed_cipher_is_not_involution():
+    cipher = KeyedCipher("secret", data.prime)
+    assert any(cipher(cipher(_)) != _ for _ in range(100))
+
+
+def test_keyed_cipher_matches_python():
+    cipher = KeyedCipher("secret", data.prime, bits=32)
+    python = _compile_feistel_cipher(cipher.keys, data.prime, 32, 4)
+    assert all(cipher(_) == python(_) for _ in range(0, 1 << 32, 1 << 20))
+
+
+def test_key_schedule():
+    keys = key_schedule("secret", 4)
+    assert keys == key_schedule(b"secret", 4)
+    assert 4 == len(set(keys))
+    assert keys[:2] == key_schedule("secret", 2)
+    assert keys != key_schedule("secrets", 4)
+    assert all(_.bit_length() <= 64 for _ in keys)
+    assert max(_.bit_length() for _ in key_schedule("secret", 4, 256)) > 64
+
+
+def test_keyed_cipher_prime_from_key():
+    assert KeyedCipher("a").prime == KeyedCipher("a").prime
+    assert KeyedCipher("a") == KeyedCipher(b"a")
+    assert KeyedCipher("a") != KeyedCipher("b")
+
+
+def test_keyed_cipher_params():
+    with pytest.raises(ValueError):
+        KeyedCipher("")
+    with pytest.raises(ValueError):
+        KeyedCipher("key", bits=31)
+    cipher = KeyedCipher("key", data.prime, bits=16)
+    with pytest.raises(ValueError):
+        cipher(1 << 16)
+    assert "key=..." in repr(cipher)
+    clone = pickle.loads(pickle.dumps(cipher))
+    assert clone == cipher and hash(clone) == hash(cipher)
+    assert clone(101) == cipher(101)
+    assert cipher.__eq__(5) is NotImplemented
+
+
+def test_keyed_schedule_length():
+    """A key schedule must have one key per round."""
+    with pytest.raises(ValueError):
+        _compile_feistel_cipher((1, 2), data.prime, 32, 4)
+    np = pytest.importorskip("numpy")
+    from obscure.arrays import transform_array
+
+    with pytest.raises(ValueError):
+        transform_array(np.arange(3), (1, 2), data.prime, 32, 4)
+
+
+def test_keyed_cipher_encoder():
+    encoder = Encoder(KeyedCipher("key", data.prime), "base32")
+    assert encoder.func is encoder.cipher.transform
+    assert encoder.inverse is encoder.cipher.inverse
+    assert 101038 == encoder.decode(encoder.encode(101038))
+    clone = pickle.loads(pickle.dumps(encoder))
+    assert 101038 == clone.decode(encoder.encode(101038))
+
+
+def test_keyed_cipher_arrays():
+    np = pytest.importorskip("numpy")
+    cipher = KeyedCipher("key", data.prime, bits=64)
+    values = np.arange(0, 1 << 62, 1 << 52, dtype=np.uint64)
+    result = cipher.transform_array(values)
+    assert [cipher(int(_)) for _ in values] == result.tolist()
+    assert values.tolist() == cipher.inverse_array(result).tolist()
+
+
+def test_keyed_cipher_transform_range():
+    cipher = KeyedCipher("key", data.prime)
+    chunks = list(cipher.transform_range(0, 250, chunk=100))
+    assert sum(chunks, []) == [cipher(_) for _ in range(250)]
+    pytest.importorskip("numpy")
+    arrays = cipher.transform_range(0, 250, chunk=100, as_array=True)
+    assert [_.tolist() for _ in arrays] == chunks
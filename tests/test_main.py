@@ -1,4 +1,7 @@
+import pytest
+
 import tests.shared_data as data
+from obscure import FeistelCipher
 from obscure.__main__ import main
 from obscure.encoder import hex_encode
 
@@ -56,3 +59,81 @@ def test_main_demo(capsys):
         mode, value = line.split()
         # Strip tailing ':' from mode and [' value ']
         assert expected[mode[:-1]] == value[1:-1].strip("'")
+
+
+def test_main_fixed(capsys):
+    main(f"{_FEISTEL} --fixed --demo 0 101038".split())
+    out = capsys.readouterr().out
+    assert "hex:   ['80d14980', " in out
+
+
+def test_main_fixed_decode(capsys):
+    main(f"{_FEISTEL} --fixed --mode hex --decode 80d14980".split())
+    assert "0" == capsys.readouterr().out.strip()
+
+
+def test_main_encode_mode(capsys):
+    main(f"{_FEISTEL} --mode hex --encode 0".split())
+    assert "80d14980" == capsys.readouterr().out.strip()
+
+
+def test_main_stream_files(tmp_path):
+    source, target = tmp_path / "ids.txt", tmp_path / "tokens.txt"
+    source.write_text("0\n\n1\n101038\n")
+    main(f"{_FEISTEL} --mode base32 --encode -i {source} -o {target}".split())
+    tokens = target.read_text().splitlines()
+    assert "G38MK00" == tokens[0]
+    assert 3 == len(tokens)
+
+    decoded = tmp_path / "decoded.txt"
+    main(f"{_FEISTEL} --mode base32 -i {target} --output {decoded}".split())
+    assert "0\n1\n101038\n" == decoded.read_text()
+
+
+def test_main_stream_stdin(capsys, monkeypatch):
+    import io
+
+    monkeypatch.setattr("sys.stdin", io.StringIO(f"{data.fx[0]}\n"))
+    main(f"{_FEISTEL} --decode --stdin".split())
+    assert "0\n" == capsys.readouterr().out
+
+
+def test_main_ex_stream_with_values(capsys):
+    main(f"{_FEISTEL} --stdin 0".split())
+    assert "either values or --input" in capsys.readouterr().out
+
+
+def test_main_stream_workers(tmp_path):
+    source, target = tmp_path / "ids.txt", tmp_path / "tokens.txt"
+    source.write_text("".join(f"{_}\n" for _ in range(1000)))
+    main(f"{_FEISTEL} --mode hex --encode -i {source} -o {target} -w 2".split())
+    tokens = target.read_text().splitlines()
+    assert "80d14980" == tokens[0]
+    assert 1000 == len(set(tokens))
+
+
+def test_main_binary(tmp_path, capsys):
+    np = pytest.importorskip("numpy")
+    source, target = tmp_path / "ids.bin", tmp_path / "out.bin"
+    np.arange(100, dtype="<u4").tofile(source)
+    main(f"{_FEISTEL} --binary uint32 -i {source} -o {target}".split())
+    assert "ids/s" in capsys.readouterr().err
+    assert data.fx[0] == np.fromfile(target, dtype="<u4")[0]
+    main(f"{_FEISTEL} --binary uint32 -i {target} --in-place".split())
+    assert list(range(100)) == np.fromfile(target, dtype="<u4").tolist()
+    main(f"{_FEISTEL} --binary uint32 -i {target} -o {target}".split())
+    cipher = FeistelCipher(data.salt, data.prime)
+    assert [cipher(_) for _ in range(100)] == np.fromfile(target, dtype="<u4").tolist()
+
+
+def test_main_binary_ex(tmp_path, capsys):
+    main(f"{_FEISTEL} --binary uint32 -i {tmp_path / 'ids.bin'}".split())
+    assert "--in-place" in capsys.readouterr().out
+    main(f"{_FEISTEL} --binary uint32 1 2".split())
+    assert "--input" in capsys.readouterr().out
+    pytest.importorskip("numpy")
+    source = tmp_path / "odd.bin"
+    source.write_bytes(b"\x01\x00\x00")
+    main(f"{_FEISTEL} --binary uint32 -i {source} --in-place".split())
+    assert "whole number of uint32" in capsys.readouterr().out
+    assert b"\x01\x00\x00" == source.read_bytes()
@@ -0,0 +1,39 @@
+import pytest
+
+import tests.shared_data as data
+from obscure import Encoder, FeistelCipher
+from obscure.parallel import transform_parallel
+
+
+@pytest.mark.parametrize("encoding", ("num", "base32"))
+def test_transform_parallel_in_order(encoding):
+    encoder = Encoder(FeistelCipher(data.salt, data.prime, 64), encoding)
+    numbers = range(0, 1 << 40, (1 << 40) // 2500)
+    params = {"bits": 64, "encoding": encoding, "workers": 2, "chunk_size": 100}
+    results = list(transform_parallel(numbers, data.salt, data.prime, **params))
+    assert results == list(encoder.encode_many(numbers))
+
+    decoded = transform_parallel(results, data.salt, data.prime, decode=True, **params)
+    assert list(numbers) == list(decoded)
+
+
+def test_transform_parallel_random_parameters():
+    numbers = [str(_) for _ in range(50)]
+    results = list(transform_parallel(numbers, None, None, workers=2, chunk_size=7))
+    assert len(set(results)) == len(numbers)
+
+
+def test_transform_parallel_ex_encoding():
+    with pytest.raises(ValueError):
+        transform_parallel([1], data.salt, data.prime, encoding="unknown")
+
+
+def test_transform_parallel_worker():
+    """The worker functions, run here as coverage does not see the pool."""
+    from obscure import parallel
+
+    parallel._init_worker(data.salt, data.prime, 32, 4, "hex", 0, False)
+    tokens = parallel._work(["0", "1"])
+    assert ["80d14980", "1d2fe525"] == tokens
+    parallel._init_worker(data.salt, data.prime, 32, 4, "hex", 0, True)
+    assert [0, 1] == parallel._work(tokens)
@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+import tests.shared_data as data
+from obscure import Encoder, EncoderRegistry, FeistelCipher, KeyedCipher
+
+
+@pytest.fixture
+def registry():
+    registry = EncoderRegistry("base32")
+    registry.register("A", FeistelCipher(data.salt, data.prime).to_dict())
+    registry.register("B", lambda: KeyedCipher("key", data.prime))
+    return registry
+
+
+def test_registry_rotation(registry):
+    assert "A" == registry.current
+    assert ["A", "B"] == registry.versions
+    old = [registry.encode(_) for _ in range(100)]
+    registry.current = "B"
+    new = [registry.encode(_) for _ in range(100)]
+    assert all(_.startswith("A") for _ in old)
+    assert all(_.startswith("B") for _ in new)
+    assert list(range(100)) == [registry.decode(_) for _ in old + new][:100]
+    assert list(range(100)) == [registry.decode(_) for _ in new]
+    assert list(range(100)) == [registry.try_decode(_) for _ in old]
+    assert ["A", "B"] == [registry.version_of(old[0]), registry.version_of(new[0])]
+
+
+def test_registry_matches_encoder(registry):
+    encoder = registry.encoder("A")
+    assert encoder.cipher == FeistelCipher(data.salt, data.prime)
+    assert "A" + encoder.encode(101038) == registry.encode(101038)
+
+
+def test_registry_cipher_instances():
+    from obscure import DomainCipher
+    from obscure.feistel import create_feistel_cipher
+
+    registry = EncoderRegistry("hex")
+    ciphers = {
+        "A": FeistelCipher(data.salt, data.prime),
+        "B": KeyedCipher("key", data.prime),
+        "C": DomainCipher(1000, data.salt, data.prime),
+        "D": create_feistel_cipher(lambda value: value * 7, 32, 4),
+    }
+    for version, cipher in ciphers.items():
+        registry.register(version, cipher)
+        registry.current = version
+        token = registry.encode(101)
+        assert version + Encoder(cipher, "hex").encode(101) == token
+        assert 101 == registry.decode(token)
+        assert registry.encoder(version).cipher is cipher
+    registry.register("E", FeistelCipher)
+    assert isinstance(registry.encoder("E").cipher, FeistelCipher)
+    with pytest.raises(ValueError):
+        EncoderRegistry("hex", 16).register("A", FeistelCipher(bits=32))
+
+
+def test_registry_lazy():
+    built = []
+
+    def factory():
+        built.append(1)
+        return FeistelCipher(data.salt, data.prime)
+
+    registry = EncoderRegistry("hex")
+    for version in "ABCDEFGH":
+        registry.register(version, factory)
+    assert [] == built
+    text = registry.encode(5)
+    assert 5 == registry.decode(text)
+    assert [1] == built
+    assert registry.encoder("A") is registry.encoder("A")
+
+
+def test_registry_threads():
+    registry = EncoderRegistry("hex")
+    registry.register("v1", FeistelCipher(data.salt, data.prime).to_dict())
+    encoders = []
+    threads = [
+        threading.Thread(target=lambda: encoders.append(registry.encoder("v1")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert 1 == len({id(_) for _ in encoders})
+
+
+def test_registry_unknown_version(registry):
+    for text in ("", "C1234", "x"):
+        with pytest.raises(ValueError):
+            registry.decode(text)
+        assert registry.try_decode(text) is None
+        assert registry.version_of(text) is None
+    assert registry.try_decode("A~~") is None
+
+
+def test_registry_ex_parameters(registry):
+    with pytest.raises(ValueError):
+        EncoderRegistry("unknown")
+    with pytest.raises(ValueError):
+        EncoderRegistry("hex").encode(1)
+    with pytest.raises(ValueError):
+        registry.register("A", lambda: FeistelCipher())
+    with pytest.raises(ValueError):
+        registry.register("CC", lambda: FeistelCipher())
+    with pytest.raises(ValueError):
+        registry.register("", lambda: FeistelCipher())
+    with pytest.raises(ValueError):
+        registry.current = "Z"
@@ -0,0 +1,133 @@
+import pickle
+
+import pytest
+
+import tests.shared_data as data
+from obscure.feistel import (
+    FeistelFx,
+    _feistel_closure,
+    create_feistel_cipher,
+    feistel_fx,
+    feistel_fx_batch,
+)
+
+
+class CountingFx:
+    """A custom round function with a batch form, counting calls."""
+
+    def __init__(self):
+        self.calls = self.batches = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        return (value * 0x9E3779B1) >> 7
+
+    def batch(self, values):
+        self.batches += 1
+        if hasattr(values, "dtype"):
+            return (values * values.dtype.type(0x9E3779B1)) >> values.dtype.type(7)
+        return [(_ * 0x9E3779B1) >> 7 for _ in values]
+
+
+def test_feistel_fx_is_partial():
+    fx = FeistelFx(data.salt, data.prime)
+    assert (data.salt, data.prime) == fx.args
+    assert fx(101038) == feistel_fx(data.salt, data.prime, 101038)
+    assert "FeistelFx(salt=4049, prime=49409)" == repr(fx)
+    clone = pickle.loads(pickle.dumps(fx))
+    assert clone.args == fx.args and isinstance(clone, FeistelFx)
+    # Still specialized by the cipher factory
+    cipher = create_feistel_cipher(fx, 32, 4)
+    assert not hasattr(cipher, "batch")
+
+
+def test_feistel_fx_batch_list():
+    fx = FeistelFx(data.salt, data.prime)
+    values = list(range(0, 1 << 32, 1 << 22))
+    assert [fx(_) for _ in values] == fx.batch(values)
+    assert fx.batch(values) == feistel_fx_batch(data.salt, data.prime, values)
+
+
+@pytest.mark.parametrize("dtype, bits", (("uint32", 32), ("uint64", 64)))
+def test_feistel_fx_batch_array(dtype, bits):
+    np = pytest.importorskip("numpy")
+    fx = FeistelFx(data.salt, data.prime)
+    values = np.arange(0, 1 << (bits // 2), 1 << (bits // 2 - 10), dtype=dtype)
+    low = (1 << (bits - 15)) - 1
+    result = fx.batch(values)
+    assert dtype == result.dtype
+    assert [fx(int(_)) & low for _ in values] == [int(_) & low for _ in result]
+    with pytest.raises(TypeError):
+        fx.batch(values.astype("int64"))
+
+
+@pytest.mark.parametrize("dtype", ("uint8", "uint16"))
+def test_feistel_fx_batch_narrow_array(dtype):
+    np = pytest.importorskip("numpy")
+    fx = FeistelFx(data.salt, data.prime)
+    values = np.arange(0, 256, dtype=dtype)
+    result = fx.batch(values)
+    wrap = np.iinfo(dtype).max
+    assert dtype == result.dtype
+    assert [fx(int(_)) & wrap for _ in values] == result.tolist()
+
+
+@pytest.mark.parametrize("dtype, bits", (("uint8", 8), ("uint16", 16), ("u4", 16)))
+def test_closure_batch_narrow_array(dtype, bits):
+    """Narrow arrays match the scalar cipher rather than wrap the product."""
+    np = pytest.importorskip("numpy")
+    cipher = _feistel_closure(FeistelFx(data.salt, data.prime), bits, 4)
+    values = np.arange(0, 1 << bits, 1 << (bits - 8), dtype=dtype)
+    result = cipher.batch(values)
+    assert dtype == result.dtype
+    assert [cipher(int(_)) for _ in values] == result.tolist()
+    with pytest.raises(ValueError):
+        cipher(1 << bits)
+    with pytest.raises(TypeError):
+        _feistel_closure(FeistelFx(data.salt, data.prime), 64, 4).batch(values)
+
+
+@pytest.mark.parametrize("domain_bits", (16, 32, 64))
+def test_closure_batch_uses_batch_fx(domain_bits):
+    fx = CountingFx()
+    cipher = _feistel_closure(fx, domain_bits, 4)
+    values = list(range(0, 1 << domain_bits, 1 << (domain_bits - 8)))
+    expected = [cipher(_) for _ in values]
+    fx.calls = 0
+    assert expected == cipher.batch(values)
+    assert (0, 4) == (fx.calls, fx.batches)
+
+
+def test_closure_batch_falls_back_to_calls():
+    def fx(value):
+        return (value * 0x9E3779B1) >> 7
+
+    cipher = _feistel_closure(fx, 32, 4)
+    values = list(range(1000))
+    assert [cipher(_) for _ in values] == cipher.batch(values)
+    assert [] == cipher.batch([])
+    with pytest.raises(ValueError):
+        cipher.batch([0, 1 << 32])
+
+
+@pytest.mark.parametrize("batch", (True, False))
+def test_closure_batch_array(batch):
+    np = pytest.importorskip("numpy")
+    fx = CountingFx() if batch else FeistelFx(data.salt, data.prime).__call__
+    cipher = _feistel_closure(fx, 32, 4)
+    values = np.arange(0, 1 << 32, 1 << 22, dtype="uint64").reshape(32, 32)
+    result = cipher.batch(values)
+    assert (32, 32) == result.shape and "uint64" == result.dtype
+    assert [cipher(int(_)) for _ in values.ravel()] == result.ravel().tolist()
+    with pytest.raises(ValueError):
+        cipher.batch(np.array([1 << 32], dtype="uint64"))
+
+
+def test_transform_range_uses_batch_fx():
+    from obscure.feistel import _transform_range
+
+    fx = CountingFx()
+    cipher = _feistel_closure(fx, 32, 4)
+    chunks = list(_transform_range(cipher, 1 << 32, 0, 250, 100))
+    assert sum(chunks, []) == [cipher(_) for _ in range(250)]
+    assert 3 * 4 == fx.batches
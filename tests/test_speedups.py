@@ -0,0 +1,104 @@
+import pytest
+
+import tests.shared_data as data
+from obscure.feistel import _compile_feistel_cipher
+from obscure.wide import _wide_closure
+
+speedups = pytest.importorskip("obscure._speedups")
+
+
+@pytest.mark.parametrize("rounds", (0, 3, 4))
+@pytest.mark.parametrize("domain_bits", (0, 16, 32, 64))
+@pytest.mark.parametrize("salt, prime", ((data.salt, data.prime), (-7, 1 << 70 | 3)))
+def test_speedups_match_python(salt, prime, domain_bits, rounds):
+    cipher = speedups.Cipher(salt, prime, domain_bits, rounds)
+    python = _compile_feistel_cipher(salt, prime, domain_bits, rounds)
+    mask = (1 << domain_bits) - 1
+    values = list(range(0, mask, max(1, mask // 1000))) + [mask]
+    expected = [python(_) for _ in values]
+    assert [cipher.transform(_) for _ in values] == expected
+    assert cipher.batch(iter(values)) == expected
+
+
+@pytest.mark.parametrize("value", (-1, 1 << 32, 1 << 64, -(1 << 64)))
+def test_speedups_ex_not_in_domain(value):
+    cipher = speedups.Cipher(data.salt, data.prime, 32, 4)
+    with pytest.raises(ValueError) as ex:
+        cipher.transform(value)
+    assert "not within domain" in str(ex)
+    with pytest.raises(ValueError):
+        cipher.batch([0, value])
+
+
+def test_speedups_ex_not_int():
+    cipher = speedups.Cipher(data.salt, data.prime, 32, 4)
+    with pytest.raises(TypeError):
+        cipher.transform(1.0)
+    with pytest.raises(TypeError):
+        cipher.batch(1)
+
+
+class Index:
+    """An integer that is not an int, as NumPy's are."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __index__(self):
+        return self.value
+
+
+def test_speedups_index():
+    """Integers such as NumPy's give the same result as the Python cipher."""
+    cipher = speedups.Cipher(data.salt, data.prime, 32, 4)
+    python = _compile_feistel_cipher(data.salt, data.prime, 32, 4)
+    assert python(101038) == cipher.transform(Index(101038))
+    assert [python(5)] == cipher.batch([Index(5)])
+    with pytest.raises(ValueError):
+        cipher.transform(Index(-1))
+
+
+@pytest.mark.parametrize("domain_bits, rounds", ((31, 4), (66, 4), (32, -1)))
+def test_speedups_ex_parameters(domain_bits, rounds):
+    with pytest.raises(ValueError):
+        speedups.Cipher(data.salt, data.prime, domain_bits, rounds)
+
+
+@pytest.mark.parametrize("domain_bits", (16, 32, 64))
+def test_speedups_key_schedule_match_python(domain_bits):
+    keys = (data.salt, -1, 1 << 63 | 5, 0)
+    cipher = speedups.Cipher(keys, data.prime, domain_bits, len(keys))
+    python = _compile_feistel_cipher(keys, data.prime, domain_bits, len(keys))
+    mask = (1 << domain_bits) - 1
+    values = list(range(0, mask, max(1, mask // 1000))) + [mask]
+    assert [cipher.transform(_) for _ in values] == [python(_) for _ in values]
+
+
+def test_speedups_key_schedule_length():
+    with pytest.raises(ValueError):
+        speedups.Cipher((1, 2), data.prime, 32, 4)
+    with pytest.raises(TypeError):
+        speedups.Cipher((1, "2"), data.prime, 32, 2)
+
+
+@pytest.mark.parametrize("domain_bits", (0, 64, 192, 640))
+def test_speedups_wide_ex_parameters(domain_bits):
+    with pytest.raises(ValueError):
+        speedups.WideCipher((1, 2), domain_bits)
+    with pytest.raises(TypeError):
+        speedups.WideCipher((1, "2"), 128)
+    with pytest.raises(ValueError):
+        speedups.WideCipher.__new__(speedups.WideCipher).transform(1)
+
+
+@pytest.mark.parametrize("domain_bits", (128, 256))
+def test_speedups_wide_index(domain_bits):
+    cipher = speedups.WideCipher((1, 2, 3), domain_bits)
+    python = _wide_closure((1, 2, 3), domain_bits)
+    assert domain_bits == cipher.bits == python.bits
+    assert python(101038) == cipher.transform(Index(101038))
+    assert [python(5)] == cipher.batch([Index(5)])
+    with pytest.raises(ValueError):
+        cipher.transform(Index(-1))
+    with pytest.raises(TypeError):
+        cipher.transform(1.0)
@@ -0,0 +1,96 @@
+import pytest
+
+import tests.shared_data as data
+from obscure import DomainCipher, Encoder, FeistelCipher, TableCipher
+
+
+@pytest.fixture(scope="module")
+def cipher16():
+    return FeistelCipher(data.salt, data.prime, bits=16)
+
+
+def test_table_cipher_build(cipher16):
+    table = TableCipher.build(cipher16)
+    assert 1 << 16 == len(table)
+    assert all(table(_) == cipher16(_) for _ in range(0, 1 << 16, 7))
+    assert all(table.inverse(table(_)) == _ for _ in range(0, 1 << 16, 7))
+
+
+def test_table_cipher_build_without_numpy():
+    """A plain function builds through per-number calls."""
+    cipher = DomainCipher(1000, data.salt, data.prime)
+    table = TableCipher.build(cipher.__call__, 1000)
+    assert [table(_) for _ in range(1000)] == [cipher(_) for _ in range(1000)]
+
+
+def test_table_cipher_build_inverse_without_numpy():
+    """A cipher with an inverse but no transform_array gets both tables."""
+    domain = DomainCipher(1000, data.salt, data.prime)
+
+    class Cipher:
+        n = 1000
+        __call__ = staticmethod(domain)
+        inverse = staticmethod(domain.inverse)
+
+    table = TableCipher.build(Cipher())
+    assert all(table(_) == domain(_) for _ in range(1000))
+    assert all(table.inverse(_) == domain.inverse(_) for _ in range(1000))
+
+
+def test_table_cipher_inverse():
+    cipher = DomainCipher(50_000, data.salt, data.prime)
+    table = TableCipher.build(cipher)
+    assert 50_000 == len(table)
+    for i in range(0, 50_000, 13):
+        assert table(i) == cipher(i)
+        assert table.inverse(i) == cipher.inverse(i)
+
+
+@pytest.mark.parametrize("use_mmap", (True, False))
+def test_table_cipher_save_load(tmp_path, use_mmap):
+    cipher = DomainCipher(5000, data.salt, data.prime)
+    path = str(tmp_path / "table.bin")
+    TableCipher.build(cipher).save(path)
+    table = TableCipher.load(path, use_mmap=use_mmap)
+    assert [table(_) for _ in range(5000)] == [cipher(_) for _ in range(5000)]
+    assert [table.inverse(_) for _ in range(5000)] == [
+        cipher.inverse(_) for _ in range(5000)
+    ]
+    encoder = Encoder(table, "base32")
+    assert 4321 == encoder.decode(encoder.encode(4321))
+    table.close()
+
+
+def test_table_cipher_save_load_involution(tmp_path, cipher16):
+    path = str(tmp_path / "table.bin")
+    TableCipher.build(cipher16).save(path)
+    assert (tmp_path / "table.bin").stat().st_size == 24 + 4 * (1 << 16)
+    table = TableCipher.load(path)
+    assert table(101038 & 0xFFFF) == cipher16(101038 & 0xFFFF)
+    table.close()
+
+
+@pytest.mark.parametrize("value", (-1, 1 << 16))
+def test_table_cipher_ex_not_in_domain(cipher16, value):
+    table = TableCipher.build(cipher16)
+    with pytest.raises(ValueError):
+        table(value)
+    with pytest.raises(ValueError):
+        table.inverse(value)
+
+
+@pytest.mark.parametrize("content", (b"junk", b"OBSCTBL1" + b"\x00" * 20))
+def test_table_cipher_ex_load(tmp_path, content):
+    path = tmp_path / "table.bin"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        TableCipher.load(str(path))
+
+
+def test_table_cipher_ex_size():
+    with pytest.raises(ValueError):
+        TableCipher.build(FeistelCipher(data.salt, data.prime, 64))
+    with pytest.raises(ValueError, match="24 bits"):
+        TableCipher.build(FeistelCipher(data.salt, data.prime, 32))
+    with pytest.raises(ValueError):
+        TableCipher.build(FeistelCipher(data.salt, data.prime, 64), 1 << 33)
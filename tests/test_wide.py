@@ -0,0 +1,92 @@
+import pickle
+import uuid
+
+import pytest
+
+from obscure import Encoder, WideCipher
+from obscure.wide import _wide_closure, mix64
+
+
+@pytest.mark.parametrize("rounds", (0, 1, 4, 7))
+@pytest.mark.parametrize("domain_bits", (128, 256, 640))
+def test_wide_cipher_inverse(domain_bits, rounds):
+    cipher = WideCipher(b"secret", domain_bits, rounds)
+    mask = (1 << domain_bits) - 1
+    for i in (*range(100), *range(0, mask, mask // 500), mask):
+        assert i == cipher.inverse(cipher(i))
+        assert i == cipher(cipher.inverse(i))
+
+
+@pytest.mark.parametrize("domain_bits", (128, 256, 384, 512))
+def test_wide_cipher_matches_python(domain_bits):
+    cipher = WideCipher("secret", domain_bits)
+    python = _wide_closure(cipher.keys, domain_bits)
+    step = (1 << domain_bits) // 997
+    assert all(cipher(_) == python(_) for _ in range(0, 1 << domain_bits, step))
+    assert [cipher(_) for _ in range(3)] == python.batch(range(3))
+    for value in (-1, 1 << domain_bits):
+        with pytest.raises(ValueError):
+            python(value)
+
+
+def test_wide_cipher_mixes_every_limb():
+    cipher = WideCipher("secret")
+    value = cipher(0)
+    for bit in (0, 63, 64, 127):
+        changed = cipher(1 << bit) ^ value
+        assert all(changed >> shift & 0xFFFF for shift in range(0, 128, 16))
+
+
+def test_mix64():
+    assert 0 == mix64(0)
+    assert len({mix64(_) for _ in range(1000)}) == 1000
+    assert all(mix64(_) < 1 << 64 for _ in (1, 1 << 63, (1 << 64) - 1))
+
+
+def test_wide_cipher_params():
+    with pytest.raises(ValueError):
+        WideCipher("")
+    with pytest.raises(ValueError):
+        WideCipher("key", bits=64)
+    cipher = WideCipher("key")
+    for value in (-1, 1 << 128):
+        with pytest.raises(ValueError):
+            cipher(value)
+    with pytest.raises(TypeError):
+        cipher(1.0)
+    assert "key=..." in repr(cipher)
+    clone = pickle.loads(pickle.dumps(cipher))
+    assert clone == cipher and hash(clone) == hash(cipher)
+    assert clone(101) == cipher(101)
+    assert cipher != WideCipher("key", 256)
+    assert cipher.__eq__("key") is NotImplemented
+
+
+def test_wide_cipher_uuid():
+    cipher = WideCipher("key")
+    for _ in range(100):
+        u = uuid.uuid4()
+        obscured = cipher.transform_uuid(u)
+        assert obscured == uuid.UUID(int=cipher(u.int))
+        assert str(obscured) == str(uuid.UUID(int=cipher(u.int)))
+        assert hash(obscured) == hash(uuid.UUID(int=obscured.int))
+        assert u == cipher.inverse_uuid(obscured)
+    assert pickle.loads(pickle.dumps(obscured)) == obscured
+    with pytest.raises(ValueError):
+        WideCipher("key", 256).transform_uuid(u)
+
+
+def test_wide_cipher_encoder():
+    encoder = Encoder(WideCipher("key"), "base32")
+    assert encoder.func is encoder.cipher.transform
+    assert encoder.inverse is encoder.cipher.inverse
+    number = uuid.uuid4().int
+    assert number == encoder.decode(encoder.encode(number))
+    chunks = list(encoder.encode_range(0, 250, chunk=100))
+    assert sum(chunks, []) == [encoder.encode(_) for _ in range(250)]
+
+
+def test_wide_cipher_transform_range():
+    cipher = WideCipher("key")
+    chunks = list(cipher.transform_range(0, 250, chunk=100))
+    assert sum(chunks, []) == [cipher(_) for _ in range(250)]